@@ -3,30 +3,58 @@ LangGraph 기반 Idris2 도메인 모델 생성 에이전트
 """
 
 import os
+import io
+import re
 import subprocess
-import json
-from typing import TypedDict, List, Optional, Literal
+import threading
+import functools
+import hashlib
+import shutil
+import tempfile
+import httpx
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from typing import TypedDict, Callable, Deque, Iterator, List, Optional, Literal, Tuple
 from pathlib import Path
+from types import MappingProxyType
 
 from langgraph.graph import StateGraph, END
+try:
+    from langgraph.checkpoint.sqlite import SqliteSaver
+except ImportError:  # 선택 의존성 (langgraph-checkpoint-sqlite)
+    SqliteSaver = None
 from langchain_core.messages import HumanMessage, SystemMessage
-from anthropic import Anthropic
+from anthropic import Anthropic, DefaultHttpxClient
 from dotenv import load_dotenv
 
 # .env 파일 로드
 load_dotenv()
 
+# idris2 실행 디렉토리 (backend/, Domains/·Pipeline/ 등 모듈 경로의 기준)
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
 from backend.agent.prompts import (
     ANALYZE_DOCUMENT_PROMPT,
     GENERATE_IDRIS_PROMPT,
+    ANALYZE_AND_GENERATE_PROMPT,
+    FIX_ERROR_SYSTEM_PROMPT,
     FIX_ERROR_PROMPT,
+    FIX_ERROR_WINDOW_PROMPT,
     FINAL_REVIEW_PROMPT,
     GENERATE_DOCUMENTABLE_PROMPT,
     GENERATE_PIPELINE_PROMPT
 )
 
+from backend.agent.llm_cache import cached_completion
+from backend.agent.idris_daemon import daemon_enabled, get_daemon
+from backend.agent import typecheck_cache, json_utils
+from backend.agent.workflow_state import MAX_LOGS, log_timestamp
+
 from backend.agent.error_classifier import (
     classify_error,
+    classify_error_level,
+    should_retry,
     decide_strategy,
     ErrorLevel,
     ErrorStrategy,
@@ -43,8 +71,10 @@ class AgentState(TypedDict):
     """에이전트 상태"""
     # 입력
     project_name: str
+    module_name: str  # Idris2 모듈 이름 (project_name의 PascalCase)
     document_type: str  # "contract", "approval", "invoice"
     reference_docs: List[str]  # 참고 문서 경로
+    user_prompt: Optional[str]  # 사용자 요청 (피드백 반영분 포함, 분석 요청에 첨부)
 
     # 중간 상태
     analysis: Optional[str]  # 문서 분석 결과
@@ -56,16 +86,19 @@ class AgentState(TypedDict):
     last_error: Optional[str]
     compile_success: bool
     error_history: List[str]  # 최근 에러 메시지 추적 (동일 에러 반복 감지)
+    last_checked_hash: Optional[str]  # 마지막으로 타입 체크한 코드의 sha256
+    no_progress_count: int  # 수정 결과가 이전 코드와 동일했던 연속 횟수
 
     # 에러 핸들링 (Phase 4b)
     classified_error: Optional[dict]  # ClassifiedError (JSON)
     error_strategy: Optional[str]  # ErrorStrategy
     user_action: Optional[str]  # 사용자 선택한 액션
+    reanalyzed: bool  # 재분석으로 돌아왔는지 (분석 단계에서 응답 캐시 생략)
 
     # 출력
     final_module_path: Optional[str]
     messages: List[str]
-    logs: List[str]  # 실시간 로그 (프론트엔드 모니터링용)
+    logs: Deque[str]  # 실시간 로그 (프론트엔드 모니터링용, 최근 MAX_LOGS개)
 
 
 # ============================================================================
@@ -74,29 +107,41 @@ class AgentState(TypedDict):
 
 def add_log(state: AgentState, message: str) -> None:
     """
-    타임스탬프와 함께 로그 메시지 추가 (최근 100개 유지)
+    타임스탬프와 함께 로그 메시지 추가 (최근 MAX_LOGS개 유지)
 
     Args:
         state: AgentState
         message: 로그 메시지
     """
-    from datetime import datetime
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    log_entry = f"[{timestamp}] {message}"
+    log_entry = f"[{log_timestamp()}] {message}"
+
+    logs = state.get("logs")
+    # 리스트나 maxlen 없는 deque(체크포인트 복원)는 링 버퍼로 변환
+    if not isinstance(logs, deque) or logs.maxlen != MAX_LOGS:
+        logs = state["logs"] = deque(logs or (), maxlen=MAX_LOGS)
 
-    if "logs" not in state:
-        state["logs"] = []
+    # 가득 차면 가장 오래된 로그가 O(1)로 밀려남
+    logs.append(log_entry)
 
-    state["logs"].append(log_entry)
-    # 최근 100개만 유지
-    if len(state["logs"]) > 100:
-        state["logs"] = state["logs"][-100:]
+
+# 프로젝트별 마지막으로 저장한 상태 JSON의 blake2b
+_SAVED_STATE_DIGESTS: dict = {}
+
+# save_state_to_file에서 마지막 N개만 저장하는 리스트 필드
+_STATE_FILE_TAILS = MappingProxyType({
+    "logs": 20,
+    "messages": 50,
+    "error_history": 10,
+})
 
 
 def save_state_to_file(state: AgentState) -> None:
     """
     현재 상태를 output/{project_name}/workflow_state.json에 저장
 
+    직전에 저장한 내용과 같으면 쓰지 않고, 다르면 임시 파일에 쓴 뒤
+    os.replace로 교체한다 (status 폴링이 반쯤 쓰인 JSON을 읽지 않음).
+
     Args:
         state: AgentState
 
@@ -105,16 +150,14 @@ def save_state_to_file(state: AgentState) -> None:
     """
     project_name = state.get("project_name", "unknown")
     output_dir = Path(f"./output/{project_name}")
-    output_dir.mkdir(parents=True, exist_ok=True)
-
     state_file = output_dir / "workflow_state.json"
 
     # State를 JSON으로 변환 (특수 객체 처리)
     state_dict = {}
     for key, value in state.items():
-        if key == "logs":
-            # 로그는 최근 20개만 저장
-            state_dict[key] = value[-20:] if value else []
+        if key in _STATE_FILE_TAILS:
+            # 로그/메시지 등은 최근 N개만 저장 (워크플로우가 길어져도 저장 크기 일정)
+            state_dict[key] = list(value)[-_STATE_FILE_TAILS[key]:] if value else []
         elif isinstance(value, (str, int, bool, float)) or value is None:
             state_dict[key] = value
         elif isinstance(value, list):
@@ -126,8 +169,24 @@ def save_state_to_file(state: AgentState) -> None:
             state_dict[key] = str(value)
 
     try:
-        with open(state_file, 'w', encoding='utf-8') as f:
-            json.dump(state_dict, f, indent=2, ensure_ascii=False)
+        payload = json_utils.dumps(state_dict, indent=True)
+        digest = hashlib.blake2b(payload, digest_size=16).digest()
+        if _SAVED_STATE_DIGESTS.get(project_name) == digest and state_file.exists():
+            print(f"   💾 State unchanged: {state_file}")
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=output_dir, prefix=f".{state_file.name}.", suffix=".tmp")
+        except FileNotFoundError:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=output_dir, prefix=f".{state_file.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, state_file)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        _SAVED_STATE_DIGESTS[project_name] = digest
         print(f"   💾 State saved to {state_file}")
     except Exception as e:
         print(f"   ⚠️ Failed to save state: {e}")
@@ -143,7 +202,7 @@ def load_idris2_guidelines() -> dict:
         dict with 'text' and 'cache_control' for Anthropic API, or None if not found
     """
     # Idris2 코드 생성 가이드라인 경로 (MCP 서버와 동일)
-    project_root = Path(__file__).parent.parent.parent
+    project_root = _PROJECT_ROOT.parent
     guidelines_path = project_root / "docs" / "IDRIS2_CODE_GENERATION_GUIDELINES.md"
 
     if not guidelines_path.exists():
@@ -168,10 +227,13 @@ def load_idris2_guidelines() -> dict:
 # Tools
 # ============================================================================
 
+@functools.lru_cache(maxsize=256)
 def to_pascal_case(snake_str: str) -> str:
     """
     snake_case를 PascalCase로 변환 (Idris2 모듈 이름 규칙)
 
+    노드마다 같은 project_name으로 반복 호출되므로 결과를 캐시한다.
+
     Examples:
         test_contract_final → TestContractFinal
         problem_input_v3 → ProblemInputV3
@@ -181,11 +243,29 @@ def to_pascal_case(snake_str: str) -> str:
     return ''.join(word.capitalize() for word in components)
 
 
+def get_module_name(state: AgentState) -> str:
+    """state의 Idris2 모듈 이름 (없으면 project_name에서 계산)"""
+    return state.get("module_name") or to_pascal_case(state["project_name"])
+
+
+# 에러 위치 "경로/파일.idr:라인:컬럼(--라인:컬럼)" (그룹: 경로/파일명, 첫 라인)
+_ERROR_LOCATION_RE = re.compile(r'([\w/]+\.idr):(\d+):\d+(?:--\d+:\d+)?')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _simplify_location(match: re.Match) -> str:
+    """에러 위치 → "파일명:라인" (경로와 컬럼 제거)"""
+    return f"{match.group(1).rsplit('/', 1)[-1]}:{match.group(2)}"
+
+
+@functools.lru_cache(maxsize=32)
 def normalize_error_message(error_msg: str) -> str:
     """
     에러 메시지를 정규화하여 동일 에러 판별용으로 변환
 
     라인 번호는 유지하고, 컬럼 번호만 제거 (다른 라인 = 진전 있음)
+    수정이 진전 없이 같은 코드를 내면 타입 체크 캐시가 같은 출력을 돌려주므로
+    최근 결과를 캐시한다.
 
     Examples:
         "Domains/Foo.idr:38:20--38:21\\nError: Couldn't parse"
@@ -194,34 +274,74 @@ def normalize_error_message(error_msg: str) -> str:
         "Domains/Foo.idr:40:5\\nError: Couldn't parse"
         → "Foo.idr:40 Error: Couldn't parse"  # 다른 라인 = 다른 에러!
     """
-    import re
-
     # 파일명:라인번호는 유지, 컬럼 번호만 제거
     # "Domains/Foo.idr:38:20--38:21" → "Foo.idr:38"
-    def simplify_location(match):
-        path = match.group(0)
-        # 파일명 추출
-        filename = path.split('/')[-1].split(':')[0]
-        # 라인 번호 추출 (첫 번째 라인만)
-        line_match = re.search(r':(\d+):', path)
-        if line_match:
-            return f"{filename}:{line_match.group(1)}"
-        return filename
-
-    normalized = re.sub(
-        r'[\w/]+\.idr:\d+:\d+(?:--\d+:\d+)?',
-        simplify_location,
-        error_msg
-    )
+    normalized = _ERROR_LOCATION_RE.sub(_simplify_location, error_msg)
 
     # 연속된 공백/줄바꿈을 하나로
-    normalized = re.sub(r'\s+', ' ', normalized)
+    normalized = _WHITESPACE_RE.sub(' ', normalized)
 
     # 첫 150자 반환 (파일명:라인 + 에러 메시지)
     return normalized.strip()[:150]
 
 
-def call_claude(system_prompt: str, user_message: str = "", temperature: float = 0.0, use_cached_guidelines: bool = True) -> str:
+# 사용 모델 (응답 캐시 키에도 포함)
+CLAUDE_MODEL = "claude-sonnet-4-5-20250929"
+
+# 프로세스 전역 Anthropic 클라이언트 (httpx 커넥션 풀 재사용)
+_CLIENT: Optional[Anthropic] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def _get_client() -> Anthropic:
+    """
+    Anthropic 클라이언트 싱글턴 반환 (최초 호출 시 생성)
+
+    노드마다 클라이언트를 새로 만들면 매번 TCP/TLS 핸드셰이크가 발생하므로
+    keep-alive 커넥션 풀을 가진 하나의 클라이언트를 모든 노드에서 공유한다.
+    """
+    global _CLIENT
+    if _CLIENT is not None:
+        return _CLIENT
+
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            # API Key 확인
+            api_key = os.getenv("ANTHROPIC_API_KEY")
+            if not api_key:
+                raise ValueError("ANTHROPIC_API_KEY not found in environment variables. Please set it in .env file.")
+
+            _CLIENT = Anthropic(
+                api_key=api_key,
+                http_client=DefaultHttpxClient(
+                    limits=httpx.Limits(max_keepalive_connections=10)
+                )
+            )
+    return _CLIENT
+
+
+def close_client() -> None:
+    """공유 클라이언트의 커넥션 풀 정리 (서버 종료 시)"""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        client, _CLIENT = _CLIENT, None
+    if client is not None:
+        client.close()
+
+
+# Anthropic prompt caching 블록 표시 (5분간 서버 측 캐시)
+_EPHEMERAL = {"type": "ephemeral"}
+
+
+@cached_completion(model=CLAUDE_MODEL)
+def call_claude(
+    system_prompt: str,
+    user_message: str = "",
+    temperature: float = 0.0,
+    use_cached_guidelines: bool = True,
+    cache_user_message: bool = False,
+    on_text: Optional[Callable[[str], None]] = None
+) -> str:
     """
     Claude Sonnet 4.5 API 호출 헬퍼 함수
 
@@ -230,22 +350,29 @@ def call_claude(system_prompt: str, user_message: str = "", temperature: float =
         user_message: 사용자 메시지 (선택)
         temperature: 생성 온도 (0.0 = deterministic)
         use_cached_guidelines: Idris2 가이드라인 캐싱 사용 여부 (기본값: True)
+        cache_user_message: 사용자 메시지도 prompt caching 대상으로 표시
+            (재분석처럼 같은 참고 문서를 다시 보내는 경우)
+        on_text: 스트리밍 중 도착한 텍스트 조각마다 호출 (진행 상황 표시용)
 
     Returns:
         LLM 응답 텍스트
-    """
-    # API Key 확인
-    api_key = os.getenv("ANTHROPIC_API_KEY")
-    if not api_key:
-        raise ValueError("ANTHROPIC_API_KEY not found in environment variables. Please set it in .env file.")
 
-    client = Anthropic(api_key=api_key)
+    Note:
+        LLM_CACHE=1이면 temperature=0 호출의 응답을 ./.cache/llm/에 캐시
+        system prompt 블록은 항상 cache_control을 붙여 보내므로 같은 prefix
+        (가이드라인 + 시스템 프롬프트)는 서버 측 캐시를 재사용한다.
+        1024 토큰 미만인 블록은 API가 캐시하지 않고 그냥 처리한다.
+    """
+    client = _get_client()
 
     messages = []
     if user_message:
+        content = user_message
+        if cache_user_message:
+            content = [{"type": "text", "text": user_message, "cache_control": _EPHEMERAL}]
         messages.append({
             "role": "user",
-            "content": user_message
+            "content": content
         })
     else:
         # user_message가 없으면 system_prompt를 user message로 사용
@@ -257,7 +384,7 @@ def call_claude(system_prompt: str, user_message: str = "", temperature: float =
 
     # API 호출
     api_params = {
-        "model": "claude-sonnet-4-5-20250929",
+        "model": CLAUDE_MODEL,
         "max_tokens": 8192,
         "temperature": temperature,
         "messages": messages
@@ -265,50 +392,97 @@ def call_claude(system_prompt: str, user_message: str = "", temperature: float =
 
     # system prompt 구성 (캐싱된 가이드라인 포함)
     if system_prompt:
+        # system은 list of content blocks 형태로 전달
+        system_blocks = []
         # use_cached_guidelines가 True이고 가이드라인이 있으면 캐싱 적용
         if use_cached_guidelines:
             guidelines = load_idris2_guidelines()
             if guidelines:
-                # system은 list of content blocks 형태로 전달
-                api_params["system"] = [
-                    guidelines,  # 캐싱된 가이드라인 (ephemeral cache)
-                    {
-                        "type": "text",
-                        "text": system_prompt
-                    }
-                ]
-            else:
-                # 가이드라인 로드 실패 시 기본 system prompt만 사용
-                api_params["system"] = system_prompt
-        else:
-            api_params["system"] = system_prompt
+                system_blocks.append(guidelines)  # 캐싱된 가이드라인 (ephemeral cache)
+        # 가이드라인 + 시스템 프롬프트 전체를 하나의 캐시 prefix로
+        system_blocks.append({
+            "type": "text",
+            "text": system_prompt,
+            "cache_control": _EPHEMERAL
+        })
+        api_params["system"] = system_blocks
+
+    # 스트리밍으로 받아 긴 응답도 HTTP 타임아웃 없이 토큰 도착과 함께 처리
+    chunks = []
+    with client.messages.stream(**api_params) as stream:
+        for text in stream.text_stream:
+            chunks.append(text)
+            if on_text:
+                on_text(text)
+
+    return "".join(chunks)
 
-    response = client.messages.create(**api_params)
 
-    return response.content[0].text
+# 스트리밍 진행 상황을 이 글자 수마다 출력
+STREAM_PROGRESS_CHARS = 2000
+
+
+def _stream_progress(label: str) -> Callable[[str], None]:
+    """call_claude(on_text=...)용 콜백: 받은 글자 수를 주기적으로 출력"""
+    received = 0
+    reported = 0
+
+    def on_text(text: str) -> None:
+        nonlocal received, reported
+        received += len(text)
+        if received - reported >= STREAM_PROGRESS_CHARS:
+            reported = received
+            print(f"   ⏳ {label}: {received} chars received")
+
+    return on_text
+
+
+# --check와 --exec가 같은 .ttc 캐시를 쓰도록 빌드 디렉토리를 고정
+# (cwd 기준: backend/.idris-build)
+IDRIS_BUILD_DIR = ".idris-build"
+
+
+# 타입 체크 출력 최대 길이 (앞부분 에러만으로 분류/수정에 충분)
+MAX_IDRIS_OUTPUT_BYTES = 64 * 1024
+
+
+def _read_idris_output(f) -> str:
+    """
+    idris2 출력을 받은 임시 파일 → str
+
+    에러 dump가 매우 클 수 있으므로 앞부분만 읽어서 디코딩한다.
+    잘린 멀티바이트 문자나 UTF-8이 아닌 바이트는 대체 문자로 바꾼다.
+    """
+    size = os.fstat(f.fileno()).st_size
+    f.seek(0)
+    text = f.read(MAX_IDRIS_OUTPUT_BYTES).decode("utf-8", errors="replace")
+    if size > MAX_IDRIS_OUTPUT_BYTES:
+        text += f"\n... (truncated {size - MAX_IDRIS_OUTPUT_BYTES} bytes)"
+    return text
 
 
 def typecheck_idris(file_path: str) -> tuple[bool, str]:
     """
     Idris2 타입 체크 실행
 
+    파일과 로컬 import 모듈의 내용, idris2 버전이 이전 검사와 같으면
+    idris2를 실행하지 않고 캐시된 결과를 반환한다.
+
     Returns:
         (success: bool, output: str)
     """
-    try:
-        result = subprocess.run(
-            ["idris2", "--check", file_path],
-            capture_output=True,
-            text=True,
-            timeout=30,
-            cwd=Path(__file__).parent.parent  # ScaleDeepSpec/ 디렉토리
-        )
-
-        success = result.returncode == 0
-        output = result.stdout + result.stderr
-
-        return success, output
+    key = version = None
+    if typecheck_cache.cache_enabled():
+        version = typecheck_cache.idris_version()
+        if version:
+            key = typecheck_cache.make_key(file_path, _PROJECT_ROOT, version)
+            cached = key and typecheck_cache.get(key)
+            if cached:
+                print(f"   💾 Typecheck cache hit ({key[:8]})")
+                return cached
 
+    try:
+        success, output = _run_typecheck(file_path)
     except subprocess.TimeoutExpired:
         return False, "Timeout: 타입 체크가 30초를 초과했습니다."
     except FileNotFoundError:
@@ -316,21 +490,255 @@ def typecheck_idris(file_path: str) -> tuple[bool, str]:
     except Exception as e:
         return False, f"Error: {str(e)}"
 
+    # 실제로 검사가 끝난 결과만 저장 (타임아웃/실행 실패는 캐시하지 않음)
+    if key:
+        typecheck_cache.put(key, success, output, version)
+    return success, output
+
+
+def _run_typecheck(file_path: str) -> tuple[bool, str]:
+    """idris2로 타입 체크 (상주 REPL 우선, 실패 시 매번 새 프로세스)"""
+    if daemon_enabled():
+        try:
+            return get_daemon(_PROJECT_ROOT, IDRIS_BUILD_DIR).check(file_path)
+        except RuntimeError as e:
+            print(f"   ⚠️ Idris2 daemon unavailable, falling back to subprocess: {e}")
+
+    # 출력은 파이프 대신 임시 파일로 받고 실패했을 때만 읽는다 (성공 시 출력은 쓰지 않음)
+    with tempfile.TemporaryFile() as out:
+        result = subprocess.run(
+            ["idris2", "--check", "--build-dir", IDRIS_BUILD_DIR, file_path],
+            stdout=out,
+            stderr=subprocess.STDOUT,
+            timeout=30,
+            cwd=_PROJECT_ROOT
+        )
+        if result.returncode == 0:
+            return True, ""
+        return False, _read_idris_output(out)
+
+
+# 프로세스 시작 직후 Prelude/base를 미리 로드할 빈 파일 (cwd 기준)
+PREWARM_FILE = f"{IDRIS_BUILD_DIR}/Prewarm.idr"
+
+_PREWARM_LOCK = threading.Lock()
+_PREWARM_STARTED = False
+
+
+def prewarm_idris() -> None:
+    """
+    백그라운드 스레드에서 빈 파일을 타입 체크해 idris2를 미리 띄움
+
+    첫 타입 체크는 Prelude/base 로딩 때문에 수 초가 걸린다. 사용자가 문서를
+    업로드하고 LLM이 코드를 생성하는 동안 이 비용을 치러 두면, 데몬이 켜진 상태로
+    첫 타입 체크를 받는다. 여러 번 호출해도 한 번만 실행된다.
+    """
+    global _PREWARM_STARTED
+    with _PREWARM_LOCK:
+        if _PREWARM_STARTED:
+            return
+        _PREWARM_STARTED = True
+
+    def prewarm() -> None:
+        try:
+            path = _PROJECT_ROOT / PREWARM_FILE
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("-- idris2 prewarm\n", encoding="utf-8")
+            # 캐시를 거치지 않고 실제로 idris2를 실행
+            _run_typecheck(PREWARM_FILE)
+            print("   🔥 Idris2 prewarmed")
+        except Exception as e:
+            print(f"   ⚠️ Idris2 prewarm failed: {e}")
+
+    threading.Thread(target=prewarm, name="idris2-prewarm", daemon=True).start()
+
+
+# 마지막으로 쓴 파일 정보: 경로 → (blake2b, mtime_ns, size)
+_WRITTEN_FILES: dict = {}
+
 
 def save_idris_file(code: str, file_path: str) -> str:
-    """Idris2 코드를 파일로 저장"""
+    """
+    Idris2 코드를 파일로 저장
+
+    디스크 내용과 같으면 쓰지 않는다 (mtime이 유지되어 Idris2 빌드 캐시도 유효).
+    직접 쓴 파일은 해시와 stat을 기억해두므로 다시 읽지 않고 비교한다.
+    같은 디렉토리의 임시 파일에 쓴 뒤 os.replace로 교체하므로 idris2나
+    병렬로 저장하는 다른 노드가 반쯤 쓰인 파일을 보는 일이 없다.
+    """
     try:
         path = Path(file_path)
-        path.parent.mkdir(parents=True, exist_ok=True)
+        data = code.encode('utf-8')
+        digest = hashlib.blake2b(data, digest_size=16).digest()
 
-        with open(path, 'w', encoding='utf-8') as f:
-            f.write(code)
+        try:
+            st = path.stat()
+            written = _WRITTEN_FILES.get(str(path.resolve()))
+            if written == (digest, st.st_mtime_ns, st.st_size):
+                return f"✅ File unchanged: {file_path}"
+            if written is None and st.st_size == len(data) and path.read_bytes() == data:
+                return f"✅ File unchanged: {file_path}"
+        except FileNotFoundError:
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        st = path.stat()
+        _WRITTEN_FILES[str(path.resolve())] = (digest, st.st_mtime_ns, st.st_size)
 
         return f"✅ File saved: {file_path}"
     except Exception as e:
         return f"❌ Error saving file: {e}"
 
 
+# PDF 텍스트 추출 디스크 캐시 디렉토리 이름 (PDF와 같은 디렉토리 아래, 프로세스 간 재사용)
+# 업로드는 output/<project>/references/ 아래이므로 캐시도 프로젝트와 함께 지워진다.
+PDF_CACHE_DIR_NAME = ".pdf-cache"
+
+
+# 분석 단계에 넣을 PDF 텍스트 최대 길이 (초과 시 이후 페이지는 추출하지 않음)
+PDF_MAX_CHARS = 120_000
+
+
+@functools.lru_cache(maxsize=1)
+def _pdf_backend() -> str:
+    """
+    사용할 PDF 추출기
+
+    네이티브 추출기(Poppler pdftotext → PDFium)가 설치되어 있으면 우선 사용하고,
+    없으면 순수 Python인 PyPDF2를 사용한다.
+    """
+    for module, backend in (("pdftotext", "poppler"), ("pypdfium2", "pdfium")):
+        try:
+            __import__(module)
+            return backend
+        except ImportError:
+            continue
+    return "pypdf2"
+
+
+def _iter_pdf_pages(path: str, backend: str):
+    """PDF 페이지 텍스트를 한 페이지씩 반환 (필요한 만큼만 파싱)"""
+    if backend == "poppler":
+        import pdftotext
+
+        with open(path, "rb") as f:
+            pdf = pdftotext.PDF(f)
+        for page_index in range(len(pdf)):
+            yield pdf[page_index]
+    elif backend == "pdfium":
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(path)
+        try:
+            for page in pdf:
+                textpage = page.get_textpage()
+                try:
+                    yield textpage.get_text_range()
+                finally:
+                    textpage.close()
+                    page.close()
+        finally:
+            pdf.close()
+    else:
+        from PyPDF2 import PdfReader
+
+        reader = PdfReader(path)
+        for page in reader.pages:
+            yield page.extract_text()
+
+
+def iter_pdf_blocks(path: str, max_chars: int = PDF_MAX_CHARS, backend: Optional[str] = None) -> Iterator[str]:
+    """
+    PDF 텍스트를 페이지 블록("--- Page N ---") 단위로 생성
+
+    페이지는 요청될 때만 파싱하므로 소비자가 중간에 멈추면 나머지 페이지는
+    읽지 않는다. max_chars를 넘으면 잘렸다는 표시를 마지막 블록으로 내보낸다.
+    """
+    total = 0
+    for page_num, page_text in enumerate(_iter_pdf_pages(path, backend or _pdf_backend()), 1):
+        if total >= max_chars:
+            yield f"\n[truncated after page {page_num - 1}]\n"
+            return
+        block = f"\n--- Page {page_num} ---\n{page_text or ''}\n"
+        total += len(block)
+        yield block
+
+
+def _pdf_cache_file(path: str, mtime_ns: int, size: int, max_chars: int, backend: str) -> Path:
+    """PDF 텍스트 디스크 캐시 파일 경로 (<PDF 디렉토리>/.pdf-cache/<key>.txt)"""
+    key = hashlib.blake2b(
+        f"{path}|{mtime_ns}|{size}|{max_chars}|{backend}".encode("utf-8"),
+        digest_size=20
+    ).hexdigest()
+    return Path(path).parent / PDF_CACHE_DIR_NAME / f"{key}.txt"
+
+
+def _pdf_is_cached(path: Path) -> bool:
+    """PDF 추출 결과가 디스크 캐시에 있는지 (파일이 없으면 False)"""
+    try:
+        st = path.stat()
+    except OSError:
+        return False
+    return _pdf_cache_file(
+        str(path.resolve()), st.st_mtime_ns, st.st_size, PDF_MAX_CHARS, _pdf_backend()
+    ).exists()
+
+
+@functools.lru_cache(maxsize=64)
+def _extract_pdf_text(path: str, mtime_ns: int, size: int, max_chars: int = PDF_MAX_CHARS) -> str:
+    """
+    PDF 텍스트 추출 (캐시)
+
+    (path, mtime, size)가 같으면 같은 파일로 보고 재파싱하지 않는다.
+    프로세스 내에서는 lru_cache, 프로세스 간에는 .pdf-cache/의 파일을 사용.
+    max_chars를 넘으면 나머지 페이지는 파싱하지 않고 잘렸다는 표시를 남긴다.
+    실패 시 예외를 그대로 올리므로 에러는 캐시되지 않는다.
+    """
+    backend = _pdf_backend()
+    cache_file = _pdf_cache_file(path, mtime_ns, size, max_chars, backend)
+    try:
+        return cache_file.read_text(encoding="utf-8")
+    except (FileNotFoundError, UnicodeDecodeError):
+        pass
+
+    text = "".join(iter_pdf_blocks(path, max_chars, backend))
+
+    # 임시 파일 → os.replace (동시 실행 시 반쯤 쓰인 캐시 방지)
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, cache_file)
+    except OSError as e:
+        print(f"   ⚠️ Failed to write PDF cache: {e}")
+
+    return text
+
+
+@functools.lru_cache(maxsize=128)
+def _read_text_file(path: str, mtime_ns: int, size: int) -> str:
+    """
+    텍스트 참고 문서 읽기 (캐시)
+
+    재분석/재시도 때 같은 파일을 다시 읽고 디코딩하지 않는다.
+    한 번만 읽고, UTF-8이 아니면 같은 바이트를 latin-1로 디코딩한다.
+    """
+    data = Path(path).read_bytes()
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        # 바이너리 파일일 경우 (latin-1은 모든 바이트를 디코딩할 수 있음)
+        return data.decode('latin-1')
+
+
 def read_reference_doc(file_name: str, project_name: str) -> str:
     """
     참고 문서 읽기 (PDF, 이미지, 텍스트 지원)
@@ -340,31 +748,26 @@ def read_reference_doc(file_name: str, project_name: str) -> str:
         project_name: 프로젝트명 (예: "test_error_fix")
 
     Supports:
-    - PDF files (.pdf) - PyPDF2로 텍스트 추출
+    - PDF files (.pdf) - pdftotext/pypdfium2(있으면) 또는 PyPDF2로 텍스트 추출
+      (mtime/size 기준 캐시, PDF_MAX_CHARS까지만)
     - Images (.jpg, .png, .jpeg) - OCR은 나중에 추가 가능
-    - Text files (.txt, .md)
+    - Text files (.txt, .md) - mtime/size 기준 캐시
     """
-    from pathlib import Path
-
     # 전체 경로 구성: output/{project_name}/references/{file_name}
     file_path = Path(f"./output/{project_name}/references/{file_name}")
     path = file_path
 
-    if not path.exists():
+    # exists() 후 다시 stat하지 않고 한 번의 stat 결과를 PDF 캐시 키에도 사용
+    try:
+        st = path.stat()
+    except FileNotFoundError:
         return f"Error: File not found: {file_path}"
 
     try:
         # PDF 처리
         if path.suffix.lower() == '.pdf':
             try:
-                from PyPDF2 import PdfReader
-
-                reader = PdfReader(file_path)
-                text = ""
-
-                for page_num, page in enumerate(reader.pages, 1):
-                    page_text = page.extract_text()
-                    text += f"\n--- Page {page_num} ---\n{page_text}\n"
+                text = _extract_pdf_text(str(path.resolve()), st.st_mtime_ns, st.st_size)
 
                 if not text.strip():
                     return f"Warning: PDF extracted but no text found: {file_path}"
@@ -372,7 +775,7 @@ def read_reference_doc(file_name: str, project_name: str) -> str:
                 return text
 
             except ImportError:
-                return "Error: PyPDF2 not installed. Run: pip install PyPDF2"
+                return "Error: PDF library not installed. Run: pip install PyPDF2 (or pdftotext / pypdfium2)"
             except Exception as e:
                 return f"Error reading PDF: {e}"
 
@@ -380,44 +783,200 @@ def read_reference_doc(file_name: str, project_name: str) -> str:
         elif path.suffix.lower() in ['.jpg', '.jpeg', '.png', '.gif']:
             return f"Warning: Image file detected: {file_path}\nOCR not yet implemented. Please provide text version."
 
-        # 텍스트 파일
+        # 텍스트 파일 (mtime/size 기준 캐시)
         else:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
+            return _read_text_file(str(path.resolve()), st.st_mtime_ns, st.st_size)
 
-    except UnicodeDecodeError:
-        # 바이너리 파일일 경우
-        try:
-            with open(file_path, 'r', encoding='latin-1') as f:
-                return f.read()
-        except Exception as e:
-            return f"Error: Cannot read file (binary?): {e}"
     except Exception as e:
         return f"Error reading file: {e}"
 
 
+def read_all_reference_docs(reference_docs: List[str], project_name: str) -> List[str]:
+    """
+    참고 문서 여러 개를 읽음 (입력 순서 유지)
+
+    - 캐시되지 않은 PDF가 2개 이상: 프로세스 풀로 추출
+      (PyPDF2는 순수 Python이라 GIL을 놓지 않고, PDFium은 스레드 안전하지 않음)
+    - 나머지 (텍스트 파일, 캐시된 PDF): 디스크 읽기뿐이므로 스레드 풀로 동시에 읽음
+    """
+    texts: List[Optional[str]] = [None] * len(reference_docs)
+
+    cold_pdfs = [
+        i for i, doc in enumerate(reference_docs)
+        if doc.lower().endswith(".pdf")
+        and not _pdf_is_cached(Path(f"./output/{project_name}/references/{doc}"))
+    ]
+    if len(cold_pdfs) >= 2:
+        max_workers = min(len(cold_pdfs), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            extracted = executor.map(
+                read_reference_doc,
+                [reference_docs[i] for i in cold_pdfs],
+                [project_name] * len(cold_pdfs)
+            )
+            for i, text in zip(cold_pdfs, extracted):
+                texts[i] = text
+
+    remaining = [i for i, text in enumerate(texts) if text is None]
+    if len(remaining) == 1:
+        texts[remaining[0]] = read_reference_doc(reference_docs[remaining[0]], project_name)
+    elif remaining:
+        with ThreadPoolExecutor(max_workers=min(8, len(remaining))) as executor:
+            read = executor.map(
+                read_reference_doc,
+                [reference_docs[i] for i in remaining],
+                [project_name] * len(remaining)
+            )
+            for i, text in zip(remaining, read):
+                texts[i] = text
+
+    return texts
+
+
+# 응답 전체를 감싼 ```idris ... ``` 코드 블록
+_FENCE_RE = re.compile(r"^```[\w+-]*[ \t]*\n(.*?)\n?```\s*$", re.DOTALL)
+
+
+def _strip_code_block(code: str) -> str:
+    """
+    응답을 감싼 ``` 코드 블록 제거
+
+    닫는 펜스가 없으면 (응답이 잘린 경우) 여는 펜스 줄만 제거한다.
+    """
+    if not code.startswith("```"):
+        return code
+    m = _FENCE_RE.match(code)
+    if m:
+        return m.group(1)
+    return code.partition("\n")[2]
+
+
+# LLM에 보낼 참고 문서 전체 길이 상한 (문자, 한글 기준 대략 50k 토큰)
+DOCS_MAX_CHARS = 150_000
+
+
+def _docs_char_limits(lengths: List[int], budget: int) -> List[int]:
+    """
+    문서별 최대 길이 (전체 합이 budget 이하)
+
+    짧은 문서는 그대로 두고, 남는 몫을 긴 문서들이 똑같이 나눠 갖는다.
+    긴 문서 하나가 예산을 다 써서 나머지 문서가 빠지는 일을 막는다.
+    """
+    limits = list(lengths)
+    remaining = budget
+    pending = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    while pending:
+        share = remaining // len(pending)
+        i = pending[0]
+        if lengths[i] > share:
+            # 남은 문서는 모두 몫보다 길다 → 균등 분배
+            for j in pending:
+                limits[j] = share
+            break
+        remaining -= lengths[i]
+        pending.pop(0)
+    return limits
+
+
+def build_docs_content(reference_docs: List[str], project_name: str) -> str:
+    """
+    참고 문서들을 "[파일명]\n본문" 블록으로 이어 붙임
+
+    같은 파일명이나 같은 내용(다른 이름으로 두 번 올린 파일)은 한 번만 넣고,
+    전체 길이가 DOCS_MAX_CHARS를 넘으면 긴 문서부터 잘라낸다.
+    문서 목록과 각 파일의 (mtime, size)가 같으면 이전 결과를 재사용한다
+    (choose_entry에서 길이를 잰 결과를 분석 노드가 그대로 사용).
+    """
+    docs = tuple(reference_docs)
+    stats = []
+    for doc in docs:
+        try:
+            st = Path(f"./output/{project_name}/references/{doc}").stat()
+            stats.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            stats.append(None)
+    return _build_docs_content(docs, project_name, tuple(stats))
+
+
+@functools.lru_cache(maxsize=8)
+def _build_docs_content(reference_docs: tuple, project_name: str, stats: tuple) -> str:
+    """build_docs_content 본체 (stats는 캐시 키로만 사용)"""
+    unique_docs = list(dict.fromkeys(reference_docs))
+    texts = read_all_reference_docs(unique_docs, project_name)
+
+    docs, seen = [], set()
+    for doc, text in zip(unique_docs, texts):
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        if digest in seen:
+            print(f"   ├─ Skipping duplicate reference doc: {doc}")
+            continue
+        seen.add(digest)
+        docs.append((doc, text))
+
+    limits = _docs_char_limits([len(text) for _, text in docs], DOCS_MAX_CHARS)
+
+    buf = io.StringIO()
+    for i, ((doc, text), limit) in enumerate(zip(docs, limits)):
+        if i:
+            buf.write("\n\n")
+        buf.write(f"[{doc}]\n")
+        if len(text) > limit:
+            print(f"   ├─ Truncating {doc}: {len(text)} → {limit} chars")
+            buf.write(text[:limit])
+            buf.write(f"\n... (이하 {len(text) - limit}자 생략)")
+        else:
+            buf.write(text)
+    return buf.getvalue()
+
+
 # ============================================================================
 # Agent Nodes
 # ============================================================================
 
+def _prompt_cache_dir(state: AgentState) -> Path:
+    """
+    프로젝트별 LLM 응답 캐시 위치 (LLM_CACHE=1일 때만 사용)
+
+    피드백 후 다시 실행할 때 프롬프트가 같은 단계(분석/도메인/Documentable/
+    Pipeline/에러 수정)는 이전 응답을 재사용한다. 피드백은 사용자 요청으로 분석
+    요청에 들어가므로 바뀐 단계부터는 키가 달라져 새로 생성된다.
+    """
+    return Path(f"./output/{state['project_name']}/prompt_cache")
+
+
+def clear_prompt_cache(project_name: str) -> None:
+    """프로젝트 LLM 응답 캐시 삭제 (명시적으로 처음부터 다시 만들 때)"""
+    shutil.rmtree(f"./output/{project_name}/prompt_cache", ignore_errors=True)
+
+
+def _analysis_message(state: AgentState, docs_content: str) -> str:
+    """분석 요청 user 메시지: 참고 문서 + 사용자 요청 (피드백이 바뀌면 캐시 키도 바뀜)"""
+    if not state.get("user_prompt"):
+        return docs_content
+    return f"{docs_content}\n\n[사용자 요청]\n{state['user_prompt']}"
+
+
 def analyze_document(state: AgentState) -> AgentState:
     """Node 1: 문서 분석"""
     print("\n📄 [1/5] Analyzing document...")
     add_log(state, "📄 문서 분석 시작...")
 
     # 참고 문서 읽기 (project_name과 함께 경로 구성)
-    docs_content = "\n\n".join([
-        f"[{doc}]\n{read_reference_doc(doc, state['project_name'])}"
-        for doc in state["reference_docs"]
-    ])
+    docs_content = build_docs_content(state["reference_docs"], state["project_name"])
 
     prompt = ANALYZE_DOCUMENT_PROMPT.format(
-        document_type=state["document_type"],
-        reference_docs=docs_content
+        document_type=state["document_type"]
     )
 
-    # Claude Sonnet 4.5 호출
-    analysis = call_claude(system_prompt=prompt, user_message=docs_content)
+    # Claude Sonnet 4.5 호출 (문서 본문은 user_message로 한 번만 전송)
+    analysis = call_claude(
+        system_prompt=prompt,
+        user_message=_analysis_message(state, docs_content),
+        cache_user_message=True,
+        cache_dir=_prompt_cache_dir(state),
+        # 재분석이면 같은 프롬프트의 이전 분석을 다시 받지 않도록 캐시 생략
+        use_cache=not state.get("reanalyzed")
+    )
 
     # 분석 결과 저장
     analysis_file = f"direction/analysis_{state['project_name']}.md"
@@ -435,7 +994,7 @@ def generate_idris_code(state: AgentState) -> AgentState:
     print("\n⚙️  [2/5] Generating Idris2 code...")
 
     # Idris2 모듈 이름은 PascalCase여야 함
-    module_name = to_pascal_case(state["project_name"])
+    module_name = get_module_name(state)
     print(f"   ├─ Project name: {state['project_name']}")
     print(f"   └─ Module name: {module_name}")
     add_log(state, f"⚙️  Idris2 코드 생성 시작: {module_name}")
@@ -446,13 +1005,15 @@ def generate_idris_code(state: AgentState) -> AgentState:
     )
 
     # Claude Sonnet 4.5 호출
-    idris_code = call_claude(system_prompt=prompt).strip()
+    idris_code = call_claude(
+        system_prompt=prompt,
+        cache_dir=_prompt_cache_dir(state),
+        on_text=_stream_progress("Domain")
+    ).strip()
     add_log(state, f"✅ Idris2 코드 생성 완료: {len(idris_code)} chars")
 
     # 코드 블록 제거 (```idris ... ```)
-    if idris_code.startswith("```"):
-        lines = idris_code.split("\n")
-        idris_code = "\n".join(lines[1:-1])
+    idris_code = _strip_code_block(idris_code)
 
     state["idris_code"] = idris_code
     # Use PascalCase for file name to match module name
@@ -463,17 +1024,100 @@ def generate_idris_code(state: AgentState) -> AgentState:
     return state
 
 
+# 참고 문서가 이 길이(문자) 이하이면 분석 + 코드 생성을 LLM 호출 1회로 처리
+# (한글 기준 대략 8k 토큰 이하 - 통합 응답도 max_tokens 안에 들어오는 크기)
+COMBINED_MAX_CHARS = 12_000
+
+_ANALYSIS_SECTION_RE = re.compile(r"<analysis>\s*(.*?)\s*</analysis>", re.DOTALL)
+_IDRIS_SECTION_RE = re.compile(r"<idris>\s*(.*?)\s*(?:</idris>|\Z)", re.DOTALL)
+
+
+def _split_combined_response(response: str) -> tuple[Optional[str], Optional[str]]:
+    """통합 응답 → (분석 결과, Idris2 코드), 태그가 없으면 해당 값은 None"""
+    analysis = _ANALYSIS_SECTION_RE.search(response)
+    code = _IDRIS_SECTION_RE.search(response)
+    return (
+        analysis.group(1) if analysis else None,
+        _strip_code_block(code.group(1)) if code and code.group(1) else None
+    )
+
+
+def choose_entry(state: AgentState) -> Literal["analyze_and_generate", "analyze"]:
+    """시작 노드 선택: 참고 문서가 짧으면 통합 호출, 길면 분석 → 생성 2단계"""
+    # 실제로 보낼 본문 길이 기준 (결과는 캐시되어 다음 노드에서 다시 만들지 않음)
+    total_chars = len(build_docs_content(state["reference_docs"], state["project_name"]))
+    if total_chars <= COMBINED_MAX_CHARS:
+        print(f"   └─ Reference docs: {total_chars} chars → single analyze+generate call")
+        return "analyze_and_generate"
+    return "analyze"
+
+
+def analyze_and_generate(state: AgentState) -> AgentState:
+    """Node 1+2: 문서 분석과 Idris2 코드 생성을 한 번의 호출로 처리"""
+    print("\n📄 [1-2/5] Analyzing document and generating Idris2 code...")
+    add_log(state, "📄 문서 분석 + Idris2 코드 생성 시작 (통합 호출)...")
+
+    module_name = get_module_name(state)
+    docs_content = build_docs_content(state["reference_docs"], state["project_name"])
+
+    prompt = ANALYZE_AND_GENERATE_PROMPT.format(
+        document_type=state["document_type"],
+        project_name=module_name
+    )
+    response = call_claude(
+        system_prompt=prompt,
+        user_message=_analysis_message(state, docs_content),
+        cache_user_message=True,
+        cache_dir=_prompt_cache_dir(state),
+        on_text=_stream_progress("Analysis + Domain")
+    )
+    analysis, idris_code = _split_combined_response(response)
+
+    if not analysis:
+        # 형식을 따르지 않은 응답 → 전체를 분석 결과로 보고 코드는 별도 생성
+        analysis, idris_code = response.strip(), None
+
+    analysis_file = f"direction/analysis_{state['project_name']}.md"
+    save_idris_file(analysis, analysis_file)
+    state["analysis"] = analysis
+    state["messages"].append(f"✅ 문서 분석 완료: {analysis_file}")
+    add_log(state, f"✅ 문서 분석 완료: {len(state['reference_docs'])}개 문서 처리")
+
+    if not idris_code:
+        print("   └─ No <idris> section in response, generating code separately")
+        return generate_idris_code(state)
+
+    state["idris_code"] = idris_code
+    state["current_file"] = f"Domains/{module_name}.idr"
+    state["messages"].append(f"✅ Idris2 코드 생성 완료")
+    add_log(state, f"✅ Idris2 코드 생성 완료: {len(idris_code)} chars")
+    print(f"   └─ File path: {state['current_file']}")
+
+    return state
+
+
 def typecheck_code(state: AgentState) -> AgentState:
     """Node 3: 타입 체크 + 에러 분류"""
     print(f"\n🔍 [3/5] Type checking (attempt {state['compile_attempts'] + 1})...")
     add_log(state, f"🔍 타입 체크 시작 (시도 {state['compile_attempts'] + 1})")
 
-    # 파일 저장
-    save_msg = save_idris_file(state["idris_code"], state["current_file"])
-    state["messages"].append(save_msg)
+    # 직전에 실패한 코드와 동일하면 (수정 결과가 그대로) 저장/타입 체크 생략
+    code_hash = hashlib.sha256(state["idris_code"].encode("utf-8")).hexdigest()
+    if code_hash == state.get("last_checked_hash") and state.get("last_error"):
+        state["no_progress_count"] = state.get("no_progress_count", 0) + 1
+        print(f"   └─ Code unchanged since last failed check (no progress x{state['no_progress_count']})")
+        add_log(state, f"⚠️ 수정된 코드가 이전과 동일 - 이전 결과 재사용 ({state['no_progress_count']}회)")
+        success, output = False, state["last_error"]
+    else:
+        state["no_progress_count"] = 0
 
-    # 타입 체크
-    success, output = typecheck_idris(state["current_file"])
+        # 파일 저장
+        save_msg = save_idris_file(state["idris_code"], state["current_file"])
+        state["messages"].append(save_msg)
+
+        # 타입 체크
+        success, output = typecheck_idris(state["current_file"])
+        state["last_checked_hash"] = code_hash
 
     state["compile_attempts"] += 1
     state["compile_success"] = success
@@ -530,6 +1174,38 @@ def typecheck_code(state: AgentState) -> AgentState:
     return state
 
 
+# 이보다 짧은 파일은 전체를 보냄 (구간 분할로 얻는 이득이 작음)
+FIX_WINDOW_MIN_LINES = 120
+# 에러 라인 앞뒤로 보낼 줄 수
+FIX_WINDOW_RADIUS = 30
+
+
+def _error_window(state: AgentState, total_lines: int) -> Optional[tuple[int, int]]:
+    """
+    에러 위치 주변 구간 (0-based [start, end)) 계산
+
+    위치를 모르거나, 다른 파일의 에러이거나, 파일이 짧으면 None (전체 전송)
+    """
+    if total_lines < FIX_WINDOW_MIN_LINES:
+        return None
+
+    location = (state.get("classified_error") or {}).get("location")
+    if not location:
+        return None
+
+    file_path, _, line = location.rpartition(":")
+    if not line.isdigit() or Path(file_path) != Path(state["current_file"]):
+        return None
+
+    error_line = int(line) - 1
+    if error_line >= total_lines:
+        return None
+
+    start = max(0, error_line - FIX_WINDOW_RADIUS)
+    end = min(total_lines, error_line + FIX_WINDOW_RADIUS + 1)
+    return start, end
+
+
 def fix_compilation_error(state: AgentState) -> AgentState:
     """Node 4: 에러 수정"""
     print(f"\n🔧 [4/5] Fixing compilation error (attempt {state['compile_attempts']})...")
@@ -538,20 +1214,51 @@ def fix_compilation_error(state: AgentState) -> AgentState:
     print(f"   └─ Calling Claude to fix code...")
     add_log(state, f"🔧 에러 수정 시작 (시도 {state['compile_attempts']}, 레벨: {error_level})")
 
-    prompt = FIX_ERROR_PROMPT.format(
-        idris_code=state["idris_code"],
-        error_message=state["last_error"]
-    )
+    # 긴 파일은 에러 주변 구간만 보내고 응답을 그 구간에 다시 끼워 넣음
+    code_lines = state["idris_code"].split("\n")
+    window = _error_window(state, len(code_lines))
+
+    if window:
+        start, end = window
+        print(f"   ├─ Sending lines {start + 1}-{end} of {len(code_lines)}")
+        user_message = FIX_ERROR_WINDOW_PROMPT.format(
+            total_lines=len(code_lines),
+            start_line=start + 1,
+            end_line=end,
+            code_window="\n".join(code_lines[start:end]),
+            error_message=state["last_error"]
+        )
+    else:
+        user_message = FIX_ERROR_PROMPT.format(
+            idris_code=state["idris_code"],
+            error_message=state["last_error"]
+        )
 
     # Claude Sonnet 4.5 호출
-    fixed_code = call_claude(system_prompt=prompt).strip()
+    # 정적인 수정 지침은 system 블록(가이드라인 뒤)으로 보내 시도마다 캐시된 prefix를 재사용하고,
+    # 매번 바뀌는 코드/에러만 user 메시지로 보낸다.
+    # 같은 코드 + 같은 에러(재분석/피드백 후 재실행)면 이전 수정 응답을 재사용한다.
+    # 직전 수정이 코드를 바꾸지 못했으면(no progress) 캐시된 응답도 같은 결과이므로 새로 요청한다.
+    response = call_claude(
+        system_prompt=FIX_ERROR_SYSTEM_PROMPT,
+        user_message=user_message,
+        cache_dir=_prompt_cache_dir(state),
+        use_cache=not state.get("no_progress_count"),
+        on_text=_stream_progress("Fix")
+    )
+    fixed_code = response.strip()
     print(f"   └─ Received fixed code ({len(fixed_code)} chars)")
 
     # 코드 블록 제거
     if fixed_code.startswith("```"):
-        lines = fixed_code.split("\n")
-        fixed_code = "\n".join(lines[1:-1])
+        fixed_code = _strip_code_block(fixed_code)
         print(f"   └─ Removed code block markers")
+    elif window:
+        # 구간 첫 줄의 들여쓰기는 유지 (Idris2는 들여쓰기에 민감)
+        fixed_code = response.strip("\n").rstrip()
+
+    if window:
+        fixed_code = "\n".join(code_lines[:start] + [fixed_code] + code_lines[end:])
 
     state["idris_code"] = fixed_code
     state["messages"].append(f"🔧 코드 수정 완료 (attempt {state['compile_attempts']})")
@@ -561,40 +1268,51 @@ def fix_compilation_error(state: AgentState) -> AgentState:
     return state
 
 
-def generate_documentable_impl(state: AgentState) -> AgentState:
-    """Node 5: Documentable 인스턴스 생성 (Phase 5)"""
-    print("\n📝 [5/7] Generating Documentable instance...")
-    add_log(state, "📝 Phase 5: Documentable 인스턴스 생성 시작")
-
-    # 도메인 코드 읽기
-    domain_code = ""
+def _read_domain_code(state: AgentState) -> str:
+    """Documentable 프롬프트에 넣을 도메인 코드 (state 우선, 없으면 파일)"""
     if state["idris_code"]:
-        domain_code = state["idris_code"]
-    else:
-        # 파일에서 읽기
-        try:
-            with open(state["current_file"], 'r', encoding='utf-8') as f:
-                domain_code = f.read()
-        except:
-            domain_code = "# Domain code not available"
+        return state["idris_code"]
+    # 파일에서 읽기
+    try:
+        with open(state["current_file"], 'r', encoding='utf-8') as f:
+            return f.read()
+    except:
+        return "# Domain code not available"
 
-    # Convert to PascalCase for module name
-    module_name = to_pascal_case(state["project_name"])
 
+def _request_documentable_code(module_name: str, domain_code: str,
+                               cache_dir: Optional[Path] = None) -> str:
+    """Claude에 Documentable 구현 요청"""
     prompt = GENERATE_DOCUMENTABLE_PROMPT.format(
         project_name=module_name,
         domain_code=domain_code
     )
+    documentable_code = call_claude(
+        system_prompt=prompt,
+        template_vars={"project_name": module_name},
+        cache_dir=cache_dir,
+        on_text=_stream_progress("Documentable")
+    ).strip()
+    return _strip_code_block(documentable_code)
 
-    # Claude Sonnet 4.5 호출
-    add_log(state, f"🤖 Claude에 Documentable 구현 요청: {module_name}")
-    documentable_code = call_claude(system_prompt=prompt).strip()
-
-    # 코드 블록 제거
-    if documentable_code.startswith("```"):
-        lines = documentable_code.split("\n")
-        documentable_code = "\n".join(lines[1:-1])
 
+def _request_pipeline_code(module_name: str, cache_dir: Optional[Path] = None) -> str:
+    """Claude에 Pipeline 구현 요청"""
+    prompt = GENERATE_PIPELINE_PROMPT.format(
+        project_name=module_name
+    )
+    # 프롬프트가 모듈 이름에만 의존하므로 다른 프로젝트의 응답도 구조적 캐시로 재사용 가능
+    pipeline_code = call_claude(
+        system_prompt=prompt,
+        template_vars={"project_name": module_name},
+        cache_dir=cache_dir,
+        on_text=_stream_progress("Pipeline")
+    ).strip()
+    return _strip_code_block(pipeline_code)
+
+
+def _save_and_check_documentable(state: AgentState, module_name: str, documentable_code: str) -> None:
+    """Documentable 파일 저장 + 타입 체크"""
     # 파일 저장 (PascalCase file name to match module name)
     documentable_file = f"DomainToDoc/{module_name}.idr"
     save_msg = save_idris_file(documentable_code, documentable_file)
@@ -611,30 +1329,9 @@ def generate_documentable_impl(state: AgentState) -> AgentState:
         state["messages"].append(f"⚠️ Documentable 타입 체크 실패:\n{output}")
         add_log(state, f"⚠️ Documentable 타입 체크 실패")
 
-    return state
-
-
-def generate_pipeline_impl(state: AgentState) -> AgentState:
-    """Node 6: Pipeline 구현 생성 (Phase 5)"""
-    print("\n⚙️ [6/7] Generating pipeline implementation...")
-    add_log(state, "⚙️ Phase 5: Pipeline 구현 생성 시작")
-
-    # Convert to PascalCase for module name
-    module_name = to_pascal_case(state["project_name"])
-
-    prompt = GENERATE_PIPELINE_PROMPT.format(
-        project_name=module_name
-    )
-
-    # Claude Sonnet 4.5 호출
-    add_log(state, f"🤖 Claude에 Pipeline 구현 요청: {module_name}")
-    pipeline_code = call_claude(system_prompt=prompt).strip()
-
-    # 코드 블록 제거
-    if pipeline_code.startswith("```"):
-        lines = pipeline_code.split("\n")
-        pipeline_code = "\n".join(lines[1:-1])
 
+def _save_and_check_pipeline(state: AgentState, module_name: str, pipeline_code: str) -> None:
+    """Pipeline 파일 저장 + 타입 체크"""
     # 파일 저장 (PascalCase file name to match module name)
     pipeline_file = f"Pipeline/{module_name}.idr"
     save_msg = save_idris_file(pipeline_code, pipeline_file)
@@ -651,83 +1348,132 @@ def generate_pipeline_impl(state: AgentState) -> AgentState:
         state["messages"].append(f"⚠️ Pipeline 타입 체크 실패:\n{output}")
         add_log(state, f"⚠️ Pipeline 타입 체크 실패")
 
+
+def generate_documentable_impl(state: AgentState) -> AgentState:
+    """Node 5: Documentable 인스턴스 생성 (Phase 5)"""
+    print("\n📝 [5/7] Generating Documentable instance...")
+    add_log(state, "📝 Phase 5: Documentable 인스턴스 생성 시작")
+
+    # Convert to PascalCase for module name
+    module_name = get_module_name(state)
+
+    # Claude Sonnet 4.5 호출
+    add_log(state, f"🤖 Claude에 Documentable 구현 요청: {module_name}")
+    documentable_code = _request_documentable_code(
+        module_name, _read_domain_code(state), _prompt_cache_dir(state)
+    )
+
+    _save_and_check_documentable(state, module_name, documentable_code)
+    return state
+
+
+def generate_pipeline_impl(state: AgentState) -> AgentState:
+    """Node 6: Pipeline 구현 생성 (Phase 5)"""
+    print("\n⚙️ [6/7] Generating pipeline implementation...")
+    add_log(state, "⚙️ Phase 5: Pipeline 구현 생성 시작")
+
+    # Convert to PascalCase for module name
+    module_name = get_module_name(state)
+
+    # Claude Sonnet 4.5 호출
+    add_log(state, f"🤖 Claude에 Pipeline 구현 요청: {module_name}")
+    pipeline_code = _request_pipeline_code(module_name, _prompt_cache_dir(state))
+
+    _save_and_check_pipeline(state, module_name, pipeline_code)
+    return state
+
+
+def generate_doc_impl_parallel(state: AgentState) -> AgentState:
+    """
+    Node 5-6: Documentable + Pipeline 동시 생성 (Phase 5)
+
+    두 LLM 요청은 서로 독립적이므로 스레드 2개로 동시에 보낸다.
+    Documentable은 응답이 오는 즉시 저장/타입 체크까지 진행해서 Pipeline 응답을
+    기다리는 시간과 겹치게 한다. Pipeline은 DomainToDoc 모듈을 import하므로
+    Documentable 타입 체크가 끝난 뒤에 검사한다.
+    """
+    print("\n📝 [5-6/7] Generating Documentable instance + pipeline implementation...")
+    add_log(state, "📝 Phase 5: Documentable / Pipeline 구현 동시 생성 시작")
+
+    # Convert to PascalCase for module name
+    module_name = get_module_name(state)
+    domain_code = _read_domain_code(state)
+    cache_dir = _prompt_cache_dir(state)
+
+    def documentable_task() -> None:
+        # state는 이 스레드만 수정 (Pipeline 스레드는 LLM 요청만 수행)
+        documentable_code = _request_documentable_code(module_name, domain_code, cache_dir)
+        _save_and_check_documentable(state, module_name, documentable_code)
+
+    # Claude Sonnet 4.5 호출 (병렬)
+    add_log(state, f"🤖 Claude에 Documentable / Pipeline 구현 요청: {module_name}")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        documentable_future = executor.submit(documentable_task)
+        pipeline_future = executor.submit(_request_pipeline_code, module_name, cache_dir)
+        documentable_future.result()
+        pipeline_code = pipeline_future.result()
+
+    _save_and_check_pipeline(state, module_name, pipeline_code)
     return state
 
 
+# (출력 키, Idris2 함수명, 표시 이름, 로그 아이콘)
+DRAFT_RENDERERS = [
+    ("text", "exampleText", "Text", "📝"),
+    ("csv", "exampleCSV", "CSV", "📊"),
+    ("markdown", "exampleMarkdown", "Markdown", "📋"),
+]
+
+
+def _run_renderer(fn: str, pipeline_file: str) -> subprocess.CompletedProcess:
+    """
+    idris2 --exec로 렌더러 함수 하나 실행
+
+    Phase 5 타입 체크와 같은 빌드 디렉토리를 사용하므로 .ttc가 최신이면
+    재elaboration 없이 바로 실행된다.
+    """
+    return subprocess.run(
+        ["idris2", "--exec", fn, "--build-dir", IDRIS_BUILD_DIR, pipeline_file],
+        capture_output=True,
+        text=True,
+        timeout=30,
+        cwd=_PROJECT_ROOT
+    )
+
+
 def generate_draft_outputs(state: AgentState) -> AgentState:
     """Node 7: 초안 생성 (Phase 6 - Draft Phase)"""
     print("\n📄 [7/7] Generating draft outputs (txt, csv, md)...")
     add_log(state, "📄 Phase 6: 초안 생성 시작 (txt, csv, md)")
 
     # Convert to PascalCase for file name
-    module_name = to_pascal_case(state["project_name"])
+    module_name = get_module_name(state)
     pipeline_file = f"Pipeline/{module_name}.idr"
 
-    # 렌더러 함수들을 idris2 --exec로 실행
+    # 렌더러 함수들을 idris2 --exec로 동시에 실행 (서로 독립적)
     outputs = {}
+    for _, _, label, icon in DRAFT_RENDERERS:
+        add_log(state, f"{icon} {label} 렌더링 실행 중...")
 
-    # Text 렌더러
-    add_log(state, "📝 Text 렌더링 실행 중...")
-    try:
-        result = subprocess.run(
-            ["idris2", "--exec", f"exampleText", pipeline_file],
-            capture_output=True,
-            text=True,
-            timeout=30,
-            cwd=Path(__file__).parent.parent
-        )
-        if result.returncode == 0:
-            outputs["text"] = result.stdout
-            state["messages"].append("✅ Text 렌더링 완료")
-            add_log(state, "✅ Text 렌더링 성공")
-        else:
-            state["messages"].append(f"⚠️ Text 렌더링 실패: {result.stderr}")
-            add_log(state, "⚠️ Text 렌더링 실패")
-    except Exception as e:
-        state["messages"].append(f"⚠️ Text 렌더링 에러: {str(e)}")
-        add_log(state, f"⚠️ Text 렌더링 에러: {str(e)}")
-
-    # CSV 렌더러
-    add_log(state, "📊 CSV 렌더링 실행 중...")
-    try:
-        result = subprocess.run(
-            ["idris2", "--exec", f"exampleCSV", pipeline_file],
-            capture_output=True,
-            text=True,
-            timeout=30,
-            cwd=Path(__file__).parent.parent
-        )
-        if result.returncode == 0:
-            outputs["csv"] = result.stdout
-            state["messages"].append("✅ CSV 렌더링 완료")
-            add_log(state, "✅ CSV 렌더링 성공")
-        else:
-            state["messages"].append(f"⚠️ CSV 렌더링 실패: {result.stderr}")
-            add_log(state, "⚠️ CSV 렌더링 실패")
-    except Exception as e:
-        state["messages"].append(f"⚠️ CSV 렌더링 에러: {str(e)}")
-        add_log(state, f"⚠️ CSV 렌더링 에러: {str(e)}")
-
-    # Markdown 렌더러
-    add_log(state, "📋 Markdown 렌더링 실행 중...")
-    try:
-        result = subprocess.run(
-            ["idris2", "--exec", f"exampleMarkdown", pipeline_file],
-            capture_output=True,
-            text=True,
-            timeout=30,
-            cwd=Path(__file__).parent.parent
-        )
-        if result.returncode == 0:
-            outputs["markdown"] = result.stdout
-            state["messages"].append("✅ Markdown 렌더링 완료")
-            add_log(state, "✅ Markdown 렌더링 성공")
-        else:
-            state["messages"].append(f"⚠️ Markdown 렌더링 실패: {result.stderr}")
-            add_log(state, "⚠️ Markdown 렌더링 실패")
-    except Exception as e:
-        state["messages"].append(f"⚠️ Markdown 렌더링 에러: {str(e)}")
-        add_log(state, f"⚠️ Markdown 렌더링 에러: {str(e)}")
+    with ThreadPoolExecutor(max_workers=len(DRAFT_RENDERERS)) as executor:
+        futures = {
+            executor.submit(_run_renderer, fn, pipeline_file): (key, label)
+            for key, fn, label, _ in DRAFT_RENDERERS
+        }
+        for future in as_completed(futures):
+            key, label = futures[future]
+            try:
+                result = future.result()
+                if result.returncode == 0:
+                    outputs[key] = result.stdout
+                    state["messages"].append(f"✅ {label} 렌더링 완료")
+                    add_log(state, f"✅ {label} 렌더링 성공")
+                else:
+                    state["messages"].append(f"⚠️ {label} 렌더링 실패: {result.stderr}")
+                    add_log(state, f"⚠️ {label} 렌더링 실패")
+            except Exception as e:
+                state["messages"].append(f"⚠️ {label} 렌더링 에러: {str(e)}")
+                add_log(state, f"⚠️ {label} 렌더링 에러: {str(e)}")
 
     # 출력 저장
     project_name = state["project_name"]
@@ -786,6 +1532,7 @@ def reanalyze_document(state: AgentState) -> AgentState:
     state["analysis"] = None
     state["idris_code"] = None
     state["compile_attempts"] = 0
+    state["reanalyzed"] = True
 
     # Phase 2로 돌아가기
     # 실제로는 analyze_document를 다시 호출해야 함
@@ -796,6 +1543,10 @@ def reanalyze_document(state: AgentState) -> AgentState:
 # Conditional Logic
 # ============================================================================
 
+# 수정 결과가 이전 코드와 동일한 횟수가 이 값에 도달하면 중단
+MAX_NO_PROGRESS = 2
+
+
 def should_continue(state: AgentState) -> Literal["finish", "fail", "fix_error", "ask_user", "reanalyze"]:
     """타입 체크 후 다음 행동 결정 (에러 분류 기반)"""
     print(f"\n🔀 Deciding next action...")
@@ -846,6 +1597,12 @@ def should_continue(state: AgentState) -> Literal["finish", "fail", "fix_error",
 
             return "ask_user"  # fail 대신 ask_user로 변경
 
+    # 수정해도 코드가 바뀌지 않는 상태가 반복되면 더 시도해도 의미 없음
+    if state.get("no_progress_count", 0) >= MAX_NO_PROGRESS:
+        print(f"   └─ Decision: fail (fix produced identical code {state['no_progress_count']} times)")
+        add_log(state, "⛔ 수정 결과가 계속 동일 - 워크플로우 중단")
+        return "fail"
+
     # 에러 전략에 따라 분기
     strategy = state.get("error_strategy")
     print(f"   ├─ Error strategy: {strategy}")
@@ -882,8 +1639,14 @@ def should_continue(state: AgentState) -> Literal["finish", "fail", "fix_error",
         return "fail"
 
     else:
-        # 기본값: 에러 전략이 없으면 계속 수정 시도 (동일 에러 3회까지만)
-        print(f"   ├─ No strategy set, using default logic")
+        # 에러 전략이 없으면 (이전 실행에서 복원된 상태 등) 에러 레벨로 재시도 여부 판단
+        # 증명/도메인 에러는 수정 루프로 거의 해결되지 않으므로 LLM 호출을 낭비하지 않음
+        level = classify_error_level(state.get("last_error") or "")
+        print(f"   ├─ No strategy set, error level: {level.value}")
+        if not should_retry(DEFAULT_RETRY_POLICY, level, state["compile_attempts"]):
+            print(f"   └─ Decision: fail (no retry for {level.value})")
+            add_log(state, f"⛔ 재시도 불가 에러 ({level.value}) - 워크플로우 중단")
+            return "fail"
         print(f"   └─ Decision: fix_error (default)")
         add_log(state, "🔄 기본 전략: 에러 수정 재시도")
         return "fix_error"
@@ -893,23 +1656,24 @@ def should_continue(state: AgentState) -> Literal["finish", "fail", "fix_error",
 # Graph Construction
 # ============================================================================
 
-def create_agent() -> StateGraph:
-    """LangGraph 에이전트 생성 (에러 핸들링 통합)"""
-
+@functools.lru_cache(maxsize=1)
+def _build_workflow() -> StateGraph:
+    """노드/엣지를 구성한 (컴파일 전) 그래프"""
     workflow = StateGraph(AgentState)
 
     # 노드 추가
+    workflow.add_node("analyze_and_generate", analyze_and_generate)
     workflow.add_node("analyze", analyze_document)
     workflow.add_node("generate", generate_idris_code)
     workflow.add_node("typecheck", typecheck_code)
     workflow.add_node("fix_error", fix_compilation_error)
     workflow.add_node("ask_user", handle_user_decision)      # Phase 4b: 사용자 결정
     workflow.add_node("reanalyze", reanalyze_document)       # Phase 4b: 재분석
-    workflow.add_node("gen_documentable", generate_documentable_impl)  # Phase 5
-    workflow.add_node("gen_pipeline", generate_pipeline_impl)           # Phase 5
+    workflow.add_node("gen_doc_impl", generate_doc_impl_parallel)       # Phase 5
     workflow.add_node("gen_draft", generate_draft_outputs)              # Phase 6
 
     # 엣지 정의
+    workflow.add_edge("analyze_and_generate", "typecheck")
     workflow.add_edge("analyze", "generate")
     workflow.add_edge("generate", "typecheck")
 
@@ -918,7 +1682,7 @@ def create_agent() -> StateGraph:
         "typecheck",
         should_continue,
         {
-            "finish": "gen_documentable",  # 성공 시 Phase 5로
+            "finish": "gen_doc_impl",      # 성공 시 Phase 5로
             "fail": END,                    # 중단
             "fix_error": "fix_error",       # 문법 에러 - 자동 수정
             "ask_user": "ask_user",         # 증명 실패 - 사용자 결정 대기
@@ -930,15 +1694,60 @@ def create_agent() -> StateGraph:
     workflow.add_edge("ask_user", END)  # 사용자 결정 후 종료 (API에서 재시작)
     workflow.add_edge("reanalyze", "analyze")  # 재분석 → 처음부터
 
-    # Phase 5-6: Documentable → Pipeline → Draft → END
-    workflow.add_edge("gen_documentable", "gen_pipeline")
-    workflow.add_edge("gen_pipeline", "gen_draft")
+    # Phase 5-6: Documentable + Pipeline (병렬) → Draft → END
+    workflow.add_edge("gen_doc_impl", "gen_draft")
     workflow.add_edge("gen_draft", END)
 
-    # 시작점
-    workflow.set_entry_point("analyze")
+    # 시작점: 참고 문서 길이에 따라 통합 호출 또는 분석 → 생성
+    workflow.set_conditional_entry_point(
+        choose_entry,
+        {
+            "analyze_and_generate": "analyze_and_generate",
+            "analyze": "analyze"
+        }
+    )
+
+    return workflow
 
-    return workflow.compile()
+
+@functools.lru_cache(maxsize=1)
+def create_agent():
+    """
+    LangGraph 에이전트 생성 (에러 핸들링 통합)
+
+    컴파일된 그래프는 상태를 갖지 않으므로 한 번만 만들어 재사용한다.
+    처음 생성할 때 idris2 프리웜도 시작한다.
+    """
+    prewarm_idris()
+    return _build_workflow().compile()
+
+
+def checkpoint_enabled() -> bool:
+    """langgraph-checkpoint-sqlite가 설치되어 있고 LANGGRAPH_CHECKPOINT=0이 아니면 사용"""
+    return SqliteSaver is not None and os.getenv("LANGGRAPH_CHECKPOINT", "1") != "0"
+
+
+@contextmanager
+def _project_agent(project_name: str) -> Iterator[Tuple[object, Optional[dict]]]:
+    """
+    프로젝트 실행용 (그래프, invoke config)
+
+    체크포인터를 쓸 수 있으면 output/<project>/checkpoints.sqlite에 노드마다
+    바뀐 채널만 기록한다 (thread_id = 프로젝트명). 중간 상태 조회/디버깅용이며
+    상태 폴링은 계속 workflow_state.json을 사용한다.
+    """
+    if not checkpoint_enabled():
+        yield create_agent(), None
+        return
+
+    create_agent()  # 프리웜
+    path = Path(f"./output/{project_name}/checkpoints.sqlite")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with SqliteSaver.from_conn_string(str(path)) as saver:
+        yield (
+            _build_workflow().compile(checkpointer=saver),
+            {"configurable": {"thread_id": project_name}}
+        )
 
 
 # ============================================================================
@@ -965,27 +1774,34 @@ def generate_domain_model(
     print("🚀 Idris2 Domain Model Generator")
     print("=" * 60)
 
-    # 초기 상태
+    # 초기 상태 (체크포인터가 이전 실행 값을 이어받지 않도록 모든 채널을 채움)
     initial_state: AgentState = {
         "project_name": project_name,
+        "module_name": to_pascal_case(project_name),
         "document_type": document_type,
         "reference_docs": reference_docs,
+        "user_prompt": None,
         "analysis": None,
         "idris_code": None,
         "current_file": "",
         "compile_attempts": 0,
         "last_error": None,
         "compile_success": False,
+        "error_history": [],
+        "last_checked_hash": None,
+        "no_progress_count": 0,
         "classified_error": None,
         "error_strategy": None,
         "user_action": None,
+        "reanalyzed": False,
         "final_module_path": None,
-        "messages": []
+        "messages": [],
+        "logs": deque(maxlen=MAX_LOGS)
     }
 
     # 에이전트 실행
-    app = create_agent()
-    result = app.invoke(initial_state)
+    with _project_agent(project_name) as (app, config):
+        result = app.invoke(initial_state, config)
 
     # 결과 출력
     print("\n" + "=" * 60)
@@ -1021,10 +1837,14 @@ def run_workflow(workflow_state):
         업데이트된 WorkflowState
     """
     # WorkflowState → AgentState 변환
+    # 체크포인터는 thread_id(프로젝트명)가 같으면 입력에 없는 채널을 이전 실행 값으로
+    # 이어받으므로 AgentState의 모든 채널을 여기서 채운다.
     agent_state: AgentState = {
         "project_name": workflow_state.project_name,
+        "module_name": to_pascal_case(workflow_state.project_name),
         "document_type": "contract",  # TODO: 프롬프트에서 추론
         "reference_docs": workflow_state.reference_docs,
+        "user_prompt": workflow_state.user_prompt,
         "analysis": workflow_state.analysis_result,
         "idris_code": workflow_state.spec_code,
         "current_file": workflow_state.spec_file or f"Domains/{workflow_state.project_name}.idr",
@@ -1032,12 +1852,15 @@ def run_workflow(workflow_state):
         "last_error": workflow_state.compile_result.error_msg if workflow_state.compile_result else None,
         "compile_success": workflow_state.compilation_phase_complete(),
         "error_history": workflow_state.error_history,  # 기존 에러 히스토리 유지
+        "last_checked_hash": None,
+        "no_progress_count": 0,
         "classified_error": workflow_state.classified_error,
         "error_strategy": workflow_state.error_strategy,
         "user_action": None,
+        "reanalyzed": False,
         "final_module_path": workflow_state.spec_file,
         "messages": [],
-        "logs": workflow_state.logs  # 기존 로그 유지
+        "logs": deque(workflow_state.logs, maxlen=MAX_LOGS)  # 기존 로그 유지
     }
 
     # Phase에 따라 시작점 결정
@@ -1048,8 +1871,8 @@ def run_workflow(workflow_state):
         workflow_state.current_phase = Phase.ANALYSIS
 
     # LangGraph 실행
-    app = create_agent()
-    result = app.invoke(agent_state)
+    with _project_agent(workflow_state.project_name) as (app, config):
+        result = app.invoke(agent_state, config)
 
     # 결과를 WorkflowState에 반영
     workflow_state.analysis_result = result.get("analysis")
@@ -1057,7 +1880,7 @@ def run_workflow(workflow_state):
     workflow_state.spec_file = result.get("final_module_path")
     workflow_state.compile_attempts = result.get("compile_attempts", 0)
     workflow_state.error_history = result.get("error_history", [])  # 에러 히스토리 저장
-    workflow_state.logs = result.get("logs", [])  # 실시간 로그 동기화
+    workflow_state.logs = deque(result.get("logs", []), maxlen=MAX_LOGS)  # 실시간 로그 동기화
 
     if result["compile_success"]:
         workflow_state.compile_result = CompileResult(success=True)
@@ -1065,7 +1888,7 @@ def run_workflow(workflow_state):
         # Phase 5 결과 반영
         # Documentable과 Pipeline 파일이 생성되었는지 확인
         from pathlib import Path
-        module_name = to_pascal_case(workflow_state.project_name)
+        module_name = agent_state["module_name"]
         documentable_file = Path(f"DomainToDoc/{module_name}.idr")
         pipeline_file = Path(f"Pipeline/{module_name}.idr")
 
@@ -78,40 +78,76 @@ class ClassifiedError:
 # 5. 에러 패턴 매칭 (Spec/ErrorHandling.idr:88-117)
 # ============================================================================
 
+# 도메인 에러 패턴
+DOMAIN_PATTERNS = [
+    "Type mismatch between",
+    "Expected type",
+    "does not have field",
+    "Can't find implementation for",
+]
+
+# 증명 실패 패턴
+PROOF_PATTERNS = [
+    "Can't solve constraint",
+    "Mismatch between",
+    "Can't unify",
+]
+
+# 문법 에러 패턴
+SYNTAX_PATTERNS = [
+    "Undefined name",
+    "Parse error",
+    "Can't find import",
+    "Unexpected token",
+    "Module name",  # Module name mismatch
+    "does not match file name",
+    "Couldn't parse",
+    "Expected",  # Expected a type declaration, Expected expression, etc.
+]
+
+
+def _compile_patterns(patterns: List[str]) -> "re.Pattern[str]":
+    """고정 문자열 패턴 목록 → 하나의 정규식"""
+    return re.compile("|".join(re.escape(p) for p in patterns))
+
+
+_DOMAIN_RE = _compile_patterns(DOMAIN_PATTERNS)
+_PROOF_RE = _compile_patterns(PROOF_PATTERNS)
+_SYNTAX_RE = _compile_patterns(SYNTAX_PATTERNS)
+
+# 전체 패턴을 한 번에 스캔하는 분류용 정규식
+# 같은 위치에서 여러 패턴이 맞으면 앞의 대안이 선택되므로 우선순위 순서로 나열
+# (예: "Expected type"은 Syntax의 "Expected"보다 Domain으로 먼저 매칭)
+_CLASSIFIER_RE = re.compile("|".join(
+    f"(?P<{level.name}>{'|'.join(re.escape(p) for p in patterns)})"
+    for level, patterns in [
+        (ErrorLevel.DOMAIN_ERROR, DOMAIN_PATTERNS),
+        (ErrorLevel.PROOF_FAILURE, PROOF_PATTERNS),
+        (ErrorLevel.SYNTAX_ERROR, SYNTAX_PATTERNS),
+    ]
+))
+
+# 우선순위 (높을수록 우선)
+_LEVEL_PRIORITY = {
+    ErrorLevel.SYNTAX_ERROR: 1,
+    ErrorLevel.PROOF_FAILURE: 2,
+    ErrorLevel.DOMAIN_ERROR: 3,
+}
+
+
 def is_domain_error(message: str) -> bool:
     """도메인 에러 패턴 검사"""
-    patterns = [
-        "Type mismatch between",
-        "Expected type",
-        "does not have field",
-        "Can't find implementation for",
-    ]
-    return any(pattern in message for pattern in patterns)
+    return _DOMAIN_RE.search(message) is not None
 
 
 def is_proof_failure(message: str) -> bool:
     """증명 실패 패턴 검사"""
-    patterns = [
-        "Can't solve constraint",
-        "Mismatch between",
-        "Can't unify",
-    ]
-    return any(pattern in message for pattern in patterns)
+    return _PROOF_RE.search(message) is not None
 
 
 def is_syntax_error(message: str) -> bool:
     """문법 에러 패턴 검사"""
-    patterns = [
-        "Undefined name",
-        "Parse error",
-        "Can't find import",
-        "Unexpected token",
-        "Module name",  # Module name mismatch
-        "does not match file name",
-        "Couldn't parse",
-        "Expected",  # Expected a type declaration, Expected expression, etc.
-    ]
-    return any(pattern in message for pattern in patterns)
+    return _SYNTAX_RE.search(message) is not None
 
 
 # ============================================================================
@@ -119,15 +155,20 @@ def is_syntax_error(message: str) -> bool:
 # ============================================================================
 
 def classify_error_level(message: str) -> ErrorLevel:
-    """에러 레벨 결정 (우선순위: Domain > Proof > Syntax)"""
-    if is_domain_error(message):
-        return ErrorLevel.DOMAIN_ERROR
-    elif is_proof_failure(message):
-        return ErrorLevel.PROOF_FAILURE
-    elif is_syntax_error(message):
-        return ErrorLevel.SYNTAX_ERROR
-    else:
-        return ErrorLevel.UNKNOWN
+    """
+    에러 레벨 결정 (우선순위: Domain > Proof > Syntax)
+
+    컴파일러 출력(수백 KB일 수 있음)을 레벨별로 여러 번 스캔하지 않고
+    _CLASSIFIER_RE로 한 번만 훑는다. Domain이 나오면 더 볼 필요가 없으므로 즉시 반환.
+    """
+    best = ErrorLevel.UNKNOWN
+    for match in _CLASSIFIER_RE.finditer(message):
+        level = ErrorLevel[match.lastgroup]
+        if level == ErrorLevel.DOMAIN_ERROR:
+            return level
+        if _LEVEL_PRIORITY[level] > _LEVEL_PRIORITY.get(best, 0):
+            best = level
+    return best
 
 
 def get_available_actions(level: ErrorLevel) -> List[UserAction]:
@@ -160,9 +201,16 @@ def is_auto_fixable(level: ErrorLevel) -> bool:
     return level == ErrorLevel.SYNTAX_ERROR
 
 
+# 에러 위치 (Domains/MyContract.idr:45:10--45:25)
+_LOC_RE = re.compile(r"([\w/]+\.idr):(\d+):\d+")
+
+# 여러 에러가 섞인 컴파일러 출력에서 각 에러의 시작
+_ERROR_START_RE = re.compile(r"^Error:", re.MULTILINE)
+
+
 def extract_location(message: str) -> Optional[ErrorLocation]:
     """에러 위치 추출 (Domains/MyContract.idr:45:10--45:25)"""
-    match = re.search(r"([\w/]+\.idr):(\d+):\d+", message)
+    match = _LOC_RE.search(message)
     if match:
         return ErrorLocation(match.group(1), int(match.group(2)))
     return None
@@ -186,6 +234,30 @@ def classify_error(message: str) -> ClassifiedError:
     )
 
 
+def split_errors(output: str) -> List[str]:
+    """
+    컴파일러 출력을 "Error:"로 시작하는 에러 단위로 분리
+
+    첫 "Error:" 앞의 빌드 진행 메시지(1/2: Building ...)는 버린다.
+    "Error:"가 없으면 출력 전체를 하나의 에러로 본다.
+    """
+    starts = [m.start() for m in _ERROR_START_RE.finditer(output)]
+    if not starts:
+        return [output] if output.strip() else []
+    ends = starts[1:] + [len(output)]
+    return [output[start:end].rstrip() for start, end in zip(starts, ends)]
+
+
+def classify_errors_batch(messages: List[str]) -> List[ClassifiedError]:
+    """
+    여러 에러를 한 번에 분류
+
+    Examples:
+        classify_errors_batch(split_errors(output))
+    """
+    return [classify_error(message) for message in messages]
+
+
 # ============================================================================
 # 7. 재시도 정책 (Spec/ErrorHandling.idr:175-215)
 # ============================================================================
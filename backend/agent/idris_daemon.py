@@ -0,0 +1,326 @@
+"""
+Idris2 IDE 모드 데몬
+
+typecheck_idris가 호출될 때마다 idris2 프로세스를 새로 띄우면 매번
+Prelude/base 로딩 비용(수백 ms ~ 수 초)을 치른다.
+`idris2 --ide-mode` 프로세스 하나를 계속 띄워두고 IDE 프로토콜의
+`(:load-file "<file>")` 명령으로 타입 체크한다.
+
+IDE 프로토콜 프레임: 6자리 16진수 길이 + S-expression
+    → 000024((:load-file "Domains/A.idr") 1)
+    ← (:write-string "1/1: Building Domains.A" 1)
+    ← (:warning (...) 1)
+    ← (:return (:ok ()) 1)  또는  (:return (:error "...") 1)
+
+IDRIS2_DAEMON=0 환경 변수로 비활성화 (매번 subprocess 실행).
+IDRIS2_DAEMONS=N이면 프로세스 N개를 띄워 동시에 실행되는 워크플로우의
+타입 체크를 병렬로 처리한다 (기본 1개).
+"""
+
+import os
+import re
+import queue
+import atexit
+import time
+import threading
+import subprocess
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+
+# 메모리 증가를 막기 위해 이 횟수만큼 사용한 프로세스는 재시작
+MAX_CALLS_PER_PROCESS = 1000
+
+# 시작에 실패하면 이 시간(초) 동안은 다시 띄우지 않고 바로 RuntimeError
+# (idris2가 없거나 IDE 모드가 깨진 환경에서 재시도마다 spawn하지 않도록)
+START_RETRY_DELAY = 60
+
+_TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|"((?:[^"\\]|\\.)*)"|([^\s()"]+))', re.DOTALL)
+_ESCAPE_RE = re.compile(r"\\(.)", re.DOTALL)
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r"}
+
+
+def daemon_enabled() -> bool:
+    """IDRIS2_DAEMON=0이 아니면 데몬 사용"""
+    return os.getenv("IDRIS2_DAEMON", "1") != "0"
+
+
+def daemon_count() -> int:
+    """IDE 모드 프로세스 수 (IDRIS2_DAEMONS, 기본 1)"""
+    try:
+        return max(1, int(os.getenv("IDRIS2_DAEMONS", "1")))
+    except ValueError:
+        return 1
+
+
+# ============================================================================
+# S-expression
+# ============================================================================
+
+class Symbol(str):
+    """S-expression 심볼 (:ok, :return 등) - 문자열 리터럴과 구분"""
+
+
+def parse_sexp(text: str) -> Any:
+    """
+    S-expression 파싱
+
+    리스트 → list, 문자열 → str, 정수 → int, 그 외 → Symbol
+    """
+    stack: List[list] = [[]]
+    pos = 0
+    while True:
+        m = _TOKEN_RE.match(text, pos)
+        if not m:
+            break
+        pos = m.end()
+        open_, close, string, atom = m.groups()
+        if open_:
+            stack.append([])
+        elif close:
+            if len(stack) == 1:
+                raise ValueError(f"unbalanced S-expression: {text[:80]!r}")
+            done = stack.pop()
+            stack[-1].append(done)
+        elif string is not None:
+            stack[-1].append(_ESCAPE_RE.sub(lambda e: _ESCAPES.get(e.group(1), e.group(1)), string))
+        elif atom.lstrip("-").isdigit():
+            stack[-1].append(int(atom))
+        else:
+            stack[-1].append(Symbol(atom))
+    if len(stack) != 1 or len(stack[0]) != 1:
+        raise ValueError(f"malformed S-expression: {text[:80]!r}")
+    return stack[0][0]
+
+
+def _quote(s: str) -> str:
+    """문자열 리터럴로 인코딩"""
+    return '"' + s.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _strings(sexp: Any) -> List[str]:
+    """S-expression 안의 문자열 리터럴 전부 (순서대로)"""
+    if isinstance(sexp, list):
+        return [s for item in sexp for s in _strings(item)]
+    if isinstance(sexp, str) and not isinstance(sexp, Symbol):
+        return [sexp]
+    return []
+
+
+def _find_position(sexp: Any) -> Optional[List[int]]:
+    """처음 나오는 (line col) 또는 (:start line col)"""
+    if not isinstance(sexp, list):
+        return None
+    ints = [x for x in sexp if isinstance(x, int)]
+    if len(ints) == 2 and len(sexp) in (2, 3):
+        return ints
+    for child in sexp:
+        found = _find_position(child)
+        if found:
+            return found
+    return None
+
+
+def _format_warning(payload: Any) -> str:
+    """
+    :warning 프레임 → "file:line:col\\n메시지"
+
+    Idris2 버전에 따라 위치 표현이 다르므로
+    ((:filename "f") (:start l c) (:end l c)) 와 ("f" (l c) (l c)) 모두 처리한다.
+    위치 형식을 --check 출력과 맞춰야 error_classifier가 위치를 추출할 수 있다.
+    """
+    strings = _strings(payload)
+    filename = next((s for s in strings if s.endswith(".idr")), None)
+    message = next((s for s in reversed(strings) if s != filename), "")
+
+    position = _find_position(payload)
+    if filename and position:
+        return f"{filename}:{position[0]}:{position[1]}\n{message}"
+    return message
+
+
+# ============================================================================
+# Daemon
+# ============================================================================
+
+class IdrisDaemon:
+    """
+    장기 실행 idris2 --ide-mode 프로세스
+
+    요청마다 증가하는 id를 붙여 보내고, 같은 id의 :return 프레임이 올 때까지
+    :write-string / :warning 프레임을 출력으로 모은다.
+    """
+
+    def __init__(self, cmd: List[str], cwd: Path, timeout: float = 30,
+                 max_calls: int = MAX_CALLS_PER_PROCESS):
+        self.cmd = cmd
+        self.cwd = cwd
+        self.timeout = timeout
+        self.max_calls = max_calls
+        self._proc: Optional[subprocess.Popen] = None
+        self._frames: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._request_id = 0
+        self._calls = 0
+        self._retry_after = 0.0
+
+    def _start(self) -> None:
+        """IDE 모드 프로세스 시작 + 프레임 리더 스레드 + 프로토콜 버전 확인"""
+        self._proc = subprocess.Popen(
+            self.cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            cwd=self.cwd
+        )
+        self._frames = queue.Queue()
+        self._calls = 0
+        threading.Thread(
+            target=self._read_frames,
+            args=(self._proc.stdout, self._frames),
+            daemon=True
+        ).start()
+
+        frame = self._next_frame()
+        if not (isinstance(frame, list) and frame[:1] == [":protocol-version"]):
+            self.close()
+            raise RuntimeError(f"unexpected idris2 IDE handshake: {frame!r}")
+
+    @staticmethod
+    def _read_frames(stdout, frames: "queue.Queue[Any]") -> None:
+        """stdout에서 길이 prefix 프레임을 읽어 파싱 후 큐에 전달 (EOF/오류 시 None)"""
+        try:
+            while True:
+                header = stdout.read(6)
+                if len(header) < 6:
+                    break
+                # 길이는 문자 수 기준 (text 모드 read와 일치)
+                body = stdout.read(int(header, 16))
+                frames.put(parse_sexp(body))
+        except (ValueError, OSError):
+            pass
+        frames.put(None)
+
+    def _next_frame(self) -> Any:
+        """다음 프레임 (timeout 시 프로세스 종료 후 TimeoutExpired)"""
+        try:
+            frame = self._frames.get(timeout=self.timeout)
+        except queue.Empty:
+            self.close()
+            raise subprocess.TimeoutExpired(self.cmd, self.timeout)
+        if frame is None:
+            self.close()
+            raise RuntimeError("idris2 IDE process exited unexpectedly")
+        return frame
+
+    def _alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def check(self, file_path: str) -> Tuple[bool, str]:
+        """
+        파일 타입 체크
+
+        Returns:
+            (success: bool, output: str)
+
+        Raises:
+            subprocess.TimeoutExpired: 응답이 timeout 안에 오지 않은 경우 (프로세스는 종료됨)
+            RuntimeError: 프로세스를 시작할 수 없거나 종료된 경우 (호출자가 subprocess로 대체)
+        """
+        with self._lock:
+            if self._alive() and self._calls >= self.max_calls:
+                self.close()
+            if not self._alive():
+                if time.monotonic() < self._retry_after:
+                    raise RuntimeError("idris2 IDE process failed to start recently")
+                try:
+                    self._start()
+                except (OSError, RuntimeError, subprocess.TimeoutExpired) as e:
+                    self._retry_after = time.monotonic() + START_RETRY_DELAY
+                    raise RuntimeError(f"idris2 IDE process start failed: {e}")
+
+            self._request_id += 1
+            self._calls += 1
+            request_id = self._request_id
+            message = f"((:load-file {_quote(file_path)}) {request_id})\n"
+            try:
+                self._proc.stdin.write(f"{len(message):06x}{message}")
+                self._proc.stdin.flush()
+            except (BrokenPipeError, OSError) as e:
+                self.close()
+                raise RuntimeError(f"idris2 IDE write failed: {e}")
+
+            output = []
+            while True:
+                frame = self._next_frame()
+                if not (isinstance(frame, list) and len(frame) >= 3 and frame[-1] == request_id):
+                    continue
+                kind, payload = frame[0], frame[1]
+
+                if kind == ":write-string":
+                    output.extend(_strings(payload))
+                elif kind == ":warning":
+                    output.append(_format_warning(payload))
+                elif kind == ":return":
+                    ok = isinstance(payload, list) and payload[:1] == [":ok"]
+                    if not ok:
+                        output.extend(_strings(payload))
+                    return ok, "\n".join(output)
+
+    def close(self) -> None:
+        """프로세스 종료 (stdin EOF)"""
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=2)
+        except Exception:
+            proc.kill()
+
+
+class IdrisDaemonPool:
+    """
+    IdrisDaemon 여러 개 (IdrisDaemon과 같은 check 인터페이스)
+
+    check마다 쉬고 있는 데몬 하나를 꺼내 쓰고 돌려놓는다. 모두 사용 중이면
+    하나가 끝날 때까지 기다린다. 프로세스는 각 데몬이 처음 쓰일 때 시작된다.
+    """
+
+    def __init__(self, daemons: List[IdrisDaemon]):
+        self.daemons = daemons
+        self._idle: "queue.Queue[IdrisDaemon]" = queue.Queue()
+        for daemon in daemons:
+            self._idle.put(daemon)
+
+    def check(self, file_path: str) -> Tuple[bool, str]:
+        """쉬고 있는 데몬으로 타입 체크 (IdrisDaemon.check 참고)"""
+        daemon = self._idle.get()
+        try:
+            return daemon.check(file_path)
+        finally:
+            self._idle.put(daemon)
+
+    def close(self) -> None:
+        for daemon in self.daemons:
+            daemon.close()
+
+
+_DAEMON: Optional[IdrisDaemonPool] = None
+_DAEMON_LOCK = threading.Lock()
+
+
+def get_daemon(cwd: Path, build_dir: str) -> IdrisDaemonPool:
+    """프로세스 전역 데몬 풀 (처음 호출 시 생성, 종료 시 atexit로 정리)"""
+    global _DAEMON
+    if _DAEMON is None:
+        with _DAEMON_LOCK:
+            if _DAEMON is None:
+                _DAEMON = IdrisDaemonPool([
+                    IdrisDaemon(["idris2", "--ide-mode", "--build-dir", build_dir], cwd=cwd)
+                    for _ in range(daemon_count())
+                ])
+                atexit.register(_DAEMON.close)
+    return _DAEMON
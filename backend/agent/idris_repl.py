@@ -0,0 +1,209 @@
+"""
+Idris2 REPL 풀 (초안 렌더러 실행용)
+
+generate_draft가 렌더러마다 `idris2 --exec fn Pipeline/X.idr`를 실행하면 매번
+컴파일러 시작 + 모듈 로드/엘라보레이션을 반복한다. 파이프라인 파일별로
+`idris2 --no-banner Pipeline/X.idr` REPL 하나를 띄워두고 `:exec fn`만 보낸다.
+
+응답의 끝은 명령 바로 뒤에 보내는 문자열 리터럴(센티널)의 평가 결과로 판단한다.
+    → :exec exampleText
+    → "__idris_repl_3__"
+    ← Pipeline.X> (exampleText 출력)
+    ← Pipeline.X> "__idris_repl_3__"
+    ← Pipeline.X>
+
+관련 소스 파일(Domains/DomainToDoc/Pipeline)의 mtime이 바뀌면 REPL을 다시 띄운다.
+IDRIS2_DAEMON=0이면 사용하지 않는다 (idris_daemon.daemon_enabled).
+"""
+
+import asyncio
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# 메모리 증가를 막기 위해 이 횟수만큼 사용한 REPL은 재시작
+MAX_CALLS_PER_PROCESS = 200
+
+READ_CHUNK_SIZE = 1 << 16
+
+
+def _sentinel(n: int) -> str:
+    return f'"__idris_repl_{n}__"'
+
+
+class IdrisRepl:
+    """
+    장기 실행 idris2 REPL 프로세스 (파이프라인 파일 하나)
+
+    명령은 asyncio.Lock으로 하나씩 보내고, 같은 REPL을 쓰는 렌더러는 순서대로 실행된다.
+    """
+
+    def __init__(self, cmd: List[str], watch: Sequence[Path], timeout: float = 30,
+                 max_calls: int = MAX_CALLS_PER_PROCESS):
+        self.cmd = cmd
+        self.source = cmd[-1]
+        self.watch = list(watch)
+        self.timeout = timeout
+        self.max_calls = max_calls
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._prompt = b""
+        self._buffer = b""
+        self._signature: Tuple = ()
+        self._lock = asyncio.Lock()
+        self._request_id = 0
+        self._calls = 0
+
+    def _current_signature(self) -> Tuple:
+        """감시 파일들의 (mtime_ns, size) (없는 파일은 None)"""
+        signature = []
+        for path in self.watch:
+            try:
+                st = path.stat()
+                signature.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _alive(self) -> bool:
+        return self._proc is not None and self._proc.returncode is None
+
+    async def _start(self) -> None:
+        """REPL 시작 + 모듈 로드 확인 + 프롬프트 문자열 파악"""
+        self._signature = self._current_signature()
+        self._proc = await asyncio.create_subprocess_exec(
+            *self.cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        self._buffer = b""
+        self._prompt = b""
+        self._calls = 0
+
+        # 로드 메시지 ... <프롬프트>"센티널"
+        loaded = (await self._send_and_read([None]))[0]
+        head, _, prompt = loaded.rpartition(b"\n")
+        if b"Error" in head or not prompt:
+            output = loaded.decode("utf-8", errors="replace")
+            await self.close()
+            raise RuntimeError(f"idris2 REPL could not load {self.source}: {output}")
+        self._prompt = prompt
+
+    async def _send_and_read(self, commands: List[Optional[str]]) -> List[bytes]:
+        """
+        명령마다 센티널을 붙여 한 번에 보내고, 각 명령의 출력(센티널 직전까지)을 순서대로 반환
+
+        Raises:
+            subprocess.TimeoutExpired: 응답이 timeout 안에 오지 않은 경우 (프로세스는 종료됨)
+            RuntimeError: 프로세스가 종료된 경우
+        """
+        lines = []
+        sentinels = []
+        for command in commands:
+            self._request_id += 1
+            sentinels.append(_sentinel(self._request_id))
+            lines += ([command] if command else []) + [sentinels[-1]]
+        try:
+            self._proc.stdin.write(("\n".join(lines) + "\n").encode("utf-8"))
+            await self._proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as e:
+            await self.close()
+            raise RuntimeError(f"idris2 REPL write failed: {e}")
+
+        return [await self._read_until(sentinel.encode()) for sentinel in sentinels]
+
+    async def _read_until(self, sentinel: bytes) -> bytes:
+        """센티널 평가 결과 줄(<프롬프트>"센티널"\n) 직전까지의 출력"""
+        marker = self._prompt + sentinel + b"\n" if self._prompt else sentinel + b"\n"
+        try:
+            while marker not in self._buffer:
+                chunk = await asyncio.wait_for(
+                    self._proc.stdout.read(READ_CHUNK_SIZE), timeout=self.timeout
+                )
+                if not chunk:
+                    await self.close()
+                    raise RuntimeError("idris2 REPL exited unexpectedly")
+                self._buffer += chunk
+        except asyncio.TimeoutError:
+            await self.close()
+            raise subprocess.TimeoutExpired(self.cmd, self.timeout)
+
+        output, _, self._buffer = self._buffer.partition(marker)
+        # 직전 명령 뒤에 출력된 프롬프트 제거
+        if self._prompt and output.startswith(self._prompt):
+            output = output[len(self._prompt):]
+        return output
+
+    async def exec(self, function: str) -> subprocess.CompletedProcess:
+        """`:exec function` 실행 (exec_many 참고)"""
+        return (await self.exec_many([function]))[0]
+
+    async def exec_many(self, functions: Sequence[str]) -> List[subprocess.CompletedProcess]:
+        """
+        `:exec function`들을 한 번에 보내 같은 로드 상태에서 순서대로 실행
+
+        Returns:
+            함수별로 idris2 --exec와 같은 형태의 CompletedProcess
+            (REPL에는 종료 코드가 없으므로 "Error:"로 시작하는 출력은 returncode 1)
+
+        Raises:
+            subprocess.TimeoutExpired: 실행이 timeout을 넘긴 경우 (명령마다 적용)
+            RuntimeError: REPL을 시작/로드할 수 없는 경우 (호출자가 --exec로 대체)
+        """
+        async with self._lock:
+            if self._alive() and (
+                self._calls >= self.max_calls or self._current_signature() != self._signature
+            ):
+                await self.close()
+            if not self._alive():
+                try:
+                    await self._start()
+                except OSError as e:
+                    raise RuntimeError(f"idris2 REPL start failed: {e}")
+
+            self._calls += len(functions)
+            outputs = await self._send_and_read([f":exec {function}" for function in functions])
+
+        results = []
+        for function, raw in zip(functions, outputs):
+            output = raw.decode("utf-8", errors="replace")
+            failed = output.lstrip().startswith("Error:")
+            results.append(subprocess.CompletedProcess(
+                ["idris2", "--exec", function, self.source],
+                1 if failed else 0,
+                "" if failed else output,
+                output if failed else ""
+            ))
+        return results
+
+    async def close(self) -> None:
+        """프로세스 종료 (:q 대신 stdin EOF)"""
+        proc, self._proc = self._proc, None
+        if proc is None or proc.returncode is not None:
+            return
+        try:
+            proc.stdin.close()
+            await asyncio.wait_for(proc.wait(), timeout=2)
+        except Exception:
+            proc.kill()
+            await proc.wait()
+
+
+_REPLS: Dict[str, IdrisRepl] = {}
+
+
+def get_repl(source: str, watch: Sequence[Path]) -> IdrisRepl:
+    """파이프라인 파일별 IdrisRepl (처음 호출 시 생성)"""
+    repl = _REPLS.get(source)
+    if repl is None:
+        repl = _REPLS[source] = IdrisRepl(["idris2", "--no-banner", source], watch)
+    return repl
+
+
+async def close_all() -> None:
+    """모든 REPL 종료 (서버 종료 시)"""
+    repls: List[IdrisRepl] = list(_REPLS.values())
+    _REPLS.clear()
+    for repl in repls:
+        await repl.close()
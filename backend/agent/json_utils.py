@@ -0,0 +1,45 @@
+"""
+JSON 직렬화 헬퍼
+
+orjson이 설치되어 있으면 사용하고 (stdlib json보다 encode/decode가 수 배 빠름),
+없으면 stdlib json으로 대체한다. 두 경우 모두 출력은 UTF-8 bytes이고
+한글 등 비 ASCII 문자를 이스케이프하지 않는다.
+"""
+
+import json
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+
+def dumps(obj: Any, indent: bool = False,
+          default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    객체 → JSON bytes
+
+    Args:
+        indent: True면 2칸 들여쓰기 (사람이 읽는 상태 파일용)
+        default: 직렬화할 수 없는 객체 변환 함수 (json.dumps의 default와 동일).
+            orjson은 dataclass/Enum을 직접 직렬화하므로 그 외 타입에만 호출된다.
+    """
+    if orjson is not None:
+        # OPT_NON_STR_KEYS: stdlib json처럼 int 등 문자열이 아닌 dict 키 허용
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=default, option=option)
+    return json.dumps(
+        obj,
+        indent=2 if indent else None,
+        ensure_ascii=False,
+        separators=None if indent else (",", ":"),
+        default=default
+    ).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """JSON bytes/str → 객체"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,210 @@
+"""
+LLM 응답 캐시
+
+temperature=0 호출은 결정적이므로 동일한 (system, user, temperature, model)
+요청은 이전 응답을 디스크(SQLite, ./.cache/llm/responses.sqlite3)에서 그대로 재사용한다.
+LLM_CACHE=1 환경 변수로 활성화한다.
+호출 시 cache_dir(프로젝트별 캐시 위치)을 넘기면 전역 캐시 대신 그 위치를 사용하고,
+use_cache=False면 LLM_CACHE=1이어도 캐시를 건너뛴다 (재분석처럼 새 응답이 필요한 경우).
+
+2단계 조회:
+1. exact-match: 프롬프트 전체가 동일한 경우
+2. structural: 프로젝트명 같은 템플릿 변수만 다른 경우
+   (변수를 마커로 치환한 프롬프트로 조회 후 응답에 현재 값을 다시 채움)
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import functools
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+
+# 캐시 저장 위치 (프로세스 cwd 기준, output/과 동일한 규칙)
+CACHE_DIR = Path("./.cache/llm")
+
+# 최대 보관 응답 수 (초과 시 가장 오래 사용되지 않은 항목부터 삭제)
+MAX_ENTRIES = 5000
+
+
+def cache_enabled() -> bool:
+    """LLM_CACHE=1일 때만 캐시 사용"""
+    return os.getenv("LLM_CACHE") == "1"
+
+
+def make_key(
+    system_prompt: str,
+    user_message: str,
+    temperature: float,
+    model: str,
+    use_cached_guidelines: bool = True
+) -> str:
+    """요청 내용으로 캐시 키 생성 (blake2b)"""
+    payload = f"{system_prompt}\x00{user_message}|{temperature}|{model}|{use_cached_guidelines}"
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=20).hexdigest()
+
+
+def _connect(cache_dir: Optional[Path] = None) -> sqlite3.Connection:
+    """
+    캐시 DB 연결 (호출마다 새 연결 - 노드가 여러 스레드에서 호출되므로)
+
+    cache_dir가 없으면 전역 CACHE_DIR 사용
+
+    테이블: responses(key TEXT PRIMARY KEY, response TEXT, ts INTEGER)
+    ts는 마지막 사용 시각 (LRU 삭제 기준)
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(cache_dir / "responses.sqlite3", timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS responses "
+        "(key TEXT PRIMARY KEY, response TEXT NOT NULL, ts INTEGER NOT NULL)"
+    )
+    return conn
+
+
+def get(key: str, cache_dir: Optional[Path] = None) -> Optional[str]:
+    """캐시 조회 (없으면 None, 있으면 사용 시각 갱신)"""
+    try:
+        conn = _connect(cache_dir)
+        try:
+            with conn:
+                row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE responses SET ts = ? WHERE key = ?", (time.time_ns(), key))
+            return row[0]
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"   ⚠️ Failed to read LLM cache: {e}")
+        return None
+
+
+def put(key: str, response: str, cache_dir: Optional[Path] = None) -> None:
+    """
+    캐시 저장
+
+    MAX_ENTRIES를 넘으면 가장 오래 사용되지 않은 항목부터 삭제한다.
+    SQLite 트랜잭션이므로 동시에 실행되는 워크플로우가 반쯤 쓰인 값을 읽는 일이 없다.
+    """
+    try:
+        conn = _connect(cache_dir)
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, ts) VALUES (?, ?, ?)",
+                    (key, response, time.time_ns())
+                )
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY ts DESC LIMIT -1 OFFSET ?)",
+                    (MAX_ENTRIES,)
+                )
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"   ⚠️ Failed to write LLM cache: {e}")
+
+
+# 너무 짧은 값은 일반 텍스트와 충돌하므로 마스킹하지 않음
+MIN_TEMPLATE_VALUE_LEN = 4
+
+
+def _marker(name: str) -> str:
+    """템플릿 변수 마커 (프롬프트/Idris2 코드에 등장하지 않는 문자 사용)"""
+    return f"⟦{name}⟧"
+
+
+def mask_template_vars(text: str, template_vars: Dict[str, str]) -> str:
+    """
+    템플릿 변수 값을 마커로 치환
+
+    Examples:
+        mask_template_vars("module Pipeline.MyContract", {"project_name": "MyContract"})
+        → "module Pipeline.⟦project_name⟧"
+    """
+    # 긴 값부터 치환 (한 값이 다른 값의 부분 문자열인 경우 대비)
+    # 단어 경계에서만 치환 ("MyContract"가 "MyContractTest" 안에서 바뀌지 않도록)
+    for name, value in sorted(template_vars.items(), key=lambda kv: len(kv[1]), reverse=True):
+        if len(value) >= MIN_TEMPLATE_VALUE_LEN:
+            pattern = rf"(?<!\w){re.escape(value)}(?!\w)"
+            text = re.sub(pattern, lambda _m, n=name: _marker(n), text)
+    return text
+
+
+def unmask_template_vars(text: str, template_vars: Dict[str, str]) -> str:
+    """마커를 현재 템플릿 변수 값으로 복원"""
+    for name, value in template_vars.items():
+        text = text.replace(_marker(name), value)
+    return text
+
+
+def cached_completion(model: str) -> Callable:
+    """
+    call_claude용 캐시 데코레이터
+
+    Args:
+        model: 캐시 키에 포함할 모델 이름 (모델이 바뀌면 캐시 무효화)
+    """
+    def decorator(func: Callable[..., str]) -> Callable[..., str]:
+        @functools.wraps(func)
+        def wrapper(
+            system_prompt: str,
+            user_message: str = "",
+            temperature: float = 0.0,
+            use_cached_guidelines: bool = True,
+            template_vars: Optional[Dict[str, str]] = None,
+            cache_dir: Optional[Path] = None,
+            use_cache: bool = True,
+            **kwargs
+        ) -> str:
+            """
+            Args:
+                template_vars: 프롬프트에 채워진 템플릿 변수 (예: {"project_name": "MyContract"})
+                    지정하면 변수 값만 다른 이전 요청의 응답도 재사용
+                cache_dir: 프로젝트별 캐시 위치 (LLM_CACHE=1일 때 전역 캐시 대신 사용)
+                use_cache: False면 캐시 조회/저장 모두 생략
+                **kwargs: 응답 내용에 영향을 주지 않는 옵션 (캐시 키에 미포함, 그대로 전달)
+            """
+            # temperature > 0 이면 응답이 비결정적이므로 캐시하지 않음
+            if not (cache_enabled() and use_cache) or temperature > 0:
+                return func(system_prompt, user_message, temperature, use_cached_guidelines, **kwargs)
+
+            # 1. exact-match
+            key = make_key(system_prompt, user_message, temperature, model, use_cached_guidelines)
+            cached = get(key, cache_dir)
+            if cached is not None:
+                print(f"   💾 LLM cache hit ({key[:8]})")
+                return cached
+
+            # 2. structural: 템플릿 변수를 마커로 치환한 프롬프트로 조회
+            structural_key = None
+            if template_vars:
+                structural_key = "s-" + make_key(
+                    mask_template_vars(system_prompt, template_vars),
+                    mask_template_vars(user_message, template_vars),
+                    temperature, model, use_cached_guidelines
+                )
+                cached = get(structural_key, cache_dir)
+                if cached is not None:
+                    print(f"   💾 LLM structural cache hit ({structural_key[2:10]})")
+                    response = unmask_template_vars(cached, template_vars)
+                    put(key, response, cache_dir)
+                    return response
+
+            response = func(system_prompt, user_message, temperature, use_cached_guidelines, **kwargs)
+            put(key, response, cache_dir)
+            if structural_key:
+                # 마스킹한 응답이 그대로 복원될 때만 저장 (복원이 어긋나면 다른 프로젝트에 틀린 응답을 줌)
+                masked = mask_template_vars(response, template_vars)
+                if unmask_template_vars(masked, template_vars) == response:
+                    put(structural_key, masked, cache_dir)
+            return response
+
+        return wrapper
+    return decorator
@@ -3,13 +3,21 @@ FastAPI Backend for TypedContract
 Handles document upload, Idris2 generation, and user feedback
 """
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form, BackgroundTasks
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
+from contextlib import asynccontextmanager
 import subprocess
+import asyncio
+import functools
+import shutil
+import hashlib
+import time
 import os
+import uuid
+import tempfile
 from pathlib import Path
 
 # Workflow state management (Spec/WorkflowTypes.idr의 Python 구현)
@@ -22,12 +30,25 @@ from backend.agent.workflow_state import (
 )
 
 # LangGraph agent
-from backend.agent.agent import run_workflow, to_pascal_case
+from backend.agent.agent import (
+    run_workflow, to_pascal_case, prewarm_idris, close_client, clear_prompt_cache
+)
+from backend.agent.idris_daemon import daemon_enabled
+from backend.agent import idris_repl
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """사용자가 문서를 올리는 동안 idris2를 미리 띄워 둠 (종료 시 렌더러 REPL, LLM 커넥션 정리)"""
+    prewarm_idris()
+    yield
+    await idris_repl.close_all()
+    close_client()
 
 app = FastAPI(
     title="TypedContract API",
     description="Type-safe contract and document generation system with formal specifications",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware for Next.js frontend
@@ -85,6 +106,260 @@ class DraftResponse(BaseModel):
     markdown_content: Optional[str] = None
     csv_content: Optional[str] = None
 
+# ============================================================
+# Background workflow
+# ============================================================
+
+# 동시에 실행할 워크플로우 수 (초과한 요청은 슬롯이 빌 때까지 대기)
+MAX_CONCURRENT_WORKFLOWS = max(1, (os.cpu_count() or 2) // 2)
+_workflow_slots = asyncio.Semaphore(MAX_CONCURRENT_WORKFLOWS)
+
+async def _run_workflow_thread(func) -> None:
+    """워크플로우 슬롯을 얻은 뒤 func를 스레드에서 실행"""
+    async with _workflow_slots:
+        await asyncio.to_thread(func)
+
+def _run_in_background(background_tasks: BackgroundTasks, func) -> None:
+    """
+    응답 후 워크플로우 함수를 별도 스레드에서 실행
+
+    동기 함수를 그대로 add_task에 넘기면 Starlette가 요청 처리용 anyio 스레드풀
+    (기본 40개, UploadFile 읽기/FileResponse도 사용)에서 실행해서 LLM + idris2
+    워크플로우가 끝날 때까지(수 분) 그 슬롯을 점유한다. asyncio.to_thread로
+    이벤트 루프의 기본 executor에서 실행해 요청 처리용 스레드풀은 비워 둔다.
+    /generate가 한꺼번에 몰려도 idris2가 CPU를 나눠 먹지 않도록
+    MAX_CONCURRENT_WORKFLOWS개까지만 동시에 실행한다.
+    """
+    background_tasks.add_task(_run_workflow_thread, func)
+
+# ============================================================
+# Files
+# ============================================================
+
+# 업로드 파일 복사 단위
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+def _safe_filename(filename: Optional[str]) -> str:
+    """업로드 파일명에서 디렉토리 부분 제거 (../ 경로 탈출 방지), 쓸 수 없는 이름이면 400"""
+    name = Path((filename or "").replace("\\", "/")).name
+    if name in ("", ".", "..") or name.startswith("."):
+        raise HTTPException(status_code=400, detail=f"Invalid file name: {filename!r}")
+    return name
+
+def _store_upload(file: UploadFile, name: str, references_dir: Path) -> Path:
+    """
+    업로드 파일을 내용 주소로 저장
+
+    본문은 references/<sha256><확장자>에 한 번만 쓰고, 원래 파일명은 그 파일을
+    가리키는 심볼릭 링크로 만든다. 같은 내용을 다시 올리면 해시만 계산하고
+    디스크에는 쓰지 않으며, PDF 추출 캐시도 실제 경로 기준이라 그대로 재사용된다.
+    본문은 임시 파일에 끝까지 쓴 뒤 os.replace로 옮기므로 중단된 업로드가
+    references/에 잘린 파일로 남지 않는다.
+
+    Args:
+        name: _safe_filename으로 검증한 파일명
+
+    Returns:
+        원래 파일명의 경로 (심볼릭 링크)
+    """
+    file.file.seek(0)
+    digest = hashlib.file_digest(file.file, "sha256").hexdigest()
+    canonical = references_dir / f"{digest}{Path(name).suffix.lower()}"
+
+    if not canonical.exists():
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=references_dir, prefix=".upload.", suffix=".tmp")
+        except FileNotFoundError:
+            # _ensure_dir 이후 디렉토리가 지워진 경우
+            references_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=references_dir, prefix=".upload.", suffix=".tmp")
+        try:
+            file.file.seek(0)
+            with os.fdopen(fd, "wb") as f:
+                shutil.copyfileobj(file.file, f, UPLOAD_CHUNK_SIZE)
+            os.replace(tmp_path, canonical)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    link = references_dir / name
+    if link == canonical or (link.is_symlink() and os.readlink(link) == canonical.name):
+        return link
+
+    # 같은 이름의 이전 업로드(파일/링크)를 원자적으로 교체
+    # 임시 링크 이름은 호출마다 고유 (같은 내용을 동시에 올리는 업로드끼리 충돌 방지)
+    tmp_link = references_dir / f".{digest}.{uuid.uuid4().hex}.link"
+    os.symlink(canonical.name, tmp_link)
+    try:
+        os.replace(tmp_link, link)
+    except BaseException:
+        tmp_link.unlink(missing_ok=True)
+        raise
+    return link
+
+@functools.lru_cache(maxsize=1024)
+def _ensure_dir(path: str) -> None:
+    """
+    디렉토리 생성 (프로세스당 경로별 1회만 mkdir)
+
+    서버 실행 중에 output 디렉토리를 지우면 캐시가 맞지 않으므로,
+    쓰는 쪽에서 FileNotFoundError가 나면 다시 만든다 (_write_text 참고).
+    """
+    Path(path).mkdir(parents=True, exist_ok=True)
+
+def _write_text(path: Path, text: str) -> None:
+    """텍스트 파일 쓰기 (디렉토리가 지워졌으면 다시 만들고 한 번 더 시도)"""
+    try:
+        path.write_text(text, encoding="utf-8")
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+def _read_output_files(output_dir: Path, names: List[str]) -> dict:
+    """output_dir에 있는 파일만 읽어서 {파일명: 내용} (디렉토리가 없으면 빈 dict)"""
+    wanted = set(names)
+    try:
+        with os.scandir(output_dir) as entries:
+            present = [e.path for e in entries if e.name in wanted and e.is_file()]
+    except FileNotFoundError:
+        return {}
+    return {Path(p).name: Path(p).read_text(encoding='utf-8') for p in present}
+
+# ============================================================
+# Subprocess
+# ============================================================
+
+# 동시에 띄울 외부 도구(pdflatex, idris2) 프로세스 수
+MAX_CONCURRENT_TOOLS = os.cpu_count() or 1
+_tool_slots = asyncio.Semaphore(MAX_CONCURRENT_TOOLS)
+
+async def _run_command(*args: str, timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+    """
+    외부 명령 실행 (이벤트 루프를 막지 않음)
+
+    subprocess.run(capture_output=True, text=True)와 같은 결과를 돌려주고,
+    timeout을 넘기면 프로세스를 종료한 뒤 subprocess.TimeoutExpired를 던진다.
+    MAX_CONCURRENT_TOOLS개를 넘는 호출은 앞선 프로세스가 끝날 때까지 대기한다
+    (timeout은 실제 실행 시간에만 적용).
+    """
+    async with _tool_slots:
+        proc = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise subprocess.TimeoutExpired(list(args), timeout)
+
+    return subprocess.CompletedProcess(
+        list(args),
+        proc.returncode,
+        stdout.decode("utf-8", errors="replace"),
+        stderr.decode("utf-8", errors="replace")
+    )
+
+# idris2 --version 결과 캐시 (헬스 체크 probe마다 프로세스를 띄우지 않음)
+IDRIS_VERSION_TTL = 60.0
+_idris_version_cache: Optional[tuple] = None  # (조회 시각 monotonic, 버전 문자열)
+
+async def _idris_version() -> str:
+    """idris2 버전 문자열 (IDRIS_VERSION_TTL초 동안 캐시, 없으면 "not available")"""
+    global _idris_version_cache
+    now = time.monotonic()
+    if _idris_version_cache and now - _idris_version_cache[0] < IDRIS_VERSION_TTL:
+        return _idris_version_cache[1]
+
+    try:
+        result = await _run_command("idris2", "--version", timeout=10)
+        version = result.stdout.strip() if result.returncode == 0 else "not available"
+    except (OSError, subprocess.TimeoutExpired):
+        version = "not available"
+
+    _idris_version_cache = (now, version)
+    return version
+
+async def _run_renderers(pipeline_file: Path, functions: List[str],
+                         watch: List[Path]) -> List[subprocess.CompletedProcess]:
+    """
+    Pipeline 렌더러 함수들 실행
+
+    파이프라인별 idris2 REPL 하나에 `:exec` 명령을 한 번에 보내, 모듈을 한 번만
+    로드한 상태에서 모든 렌더러를 실행한다. REPL을 쓸 수 없으면 (IDRIS2_DAEMON=0,
+    로드 실패 등) 렌더러마다 idris2 --exec를 동시에 실행한다.
+    """
+    if daemon_enabled():
+        try:
+            async with _tool_slots:
+                return await idris_repl.get_repl(str(pipeline_file), watch).exec_many(functions)
+        except RuntimeError as e:
+            print(f"⚠️ idris2 REPL unavailable, falling back to --exec: {e}")
+
+    results = await asyncio.gather(
+        *(
+            _run_command("idris2", "--exec", fn, str(pipeline_file), timeout=30)
+            for fn in functions
+        ),
+        return_exceptions=True
+    )
+    # 모든 프로세스가 끝난(또는 종료된) 뒤에 첫 예외를 그대로 전달
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+# ============================================================
+# LaTeX
+# ============================================================
+
+# 프리앰블을 미리 덤프한 pdflatex 포맷(.fmt) 저장 위치
+LATEX_FORMAT_DIR = Path("./output/.latex-fmt")
+_latex_format_lock = asyncio.Lock()
+
+# finalize 시 .aux가 바뀌어 다시 실행하는 최종 패스 수 상한 (참조가 수렴하지 않는 문서 대비)
+PDFLATEX_MAX_PASSES = 3
+
+def latex_format_enabled() -> bool:
+    """LATEX_FORMAT=1일 때만 프리컴파일 포맷 사용"""
+    return os.getenv("LATEX_FORMAT") == "1"
+
+async def _latex_format(preamble: str) -> Optional[Path]:
+    """
+    프리앰블(\\begin{document} 앞부분)을 덤프한 포맷 파일
+
+    kotex 등 패키지 로딩을 매 컴파일마다 반복하지 않도록 프리앰블 sha256별로
+    한 번만 `pdflatex -ini "&pdflatex" ... \\dump`로 만든다. 실패하면 None.
+    """
+    name = "preamble-" + hashlib.sha256(preamble.encode("utf-8")).hexdigest()[:16]
+    fmt_file = LATEX_FORMAT_DIR / f"{name}.fmt"
+
+    async with _latex_format_lock:
+        if fmt_file.exists():
+            return fmt_file
+
+        _ensure_dir(str(LATEX_FORMAT_DIR))
+        ini_file = LATEX_FORMAT_DIR / f"{name}.tex"
+        _write_text(ini_file, preamble + "\\dump\n")
+        result = await _run_command(
+            "pdflatex",
+            "-ini",
+            "-interaction=batchmode",
+            "-halt-on-error",
+            f"-jobname={name}",
+            f"-output-directory={LATEX_FORMAT_DIR}",
+            "&pdflatex",
+            str(ini_file)
+        )
+        if result.returncode != 0 or not fmt_file.exists():
+            print(f"⚠️ LaTeX format build failed, compiling without it: {LATEX_FORMAT_DIR / name}.log")
+            return None
+
+    print(f"✅ LaTeX format built: {fmt_file}")
+    return fmt_file
+
 # ============================================================
 # Endpoints
 # ============================================================
@@ -97,14 +372,9 @@ async def root():
 @app.get("/health")
 async def health():
     """Health check for Docker"""
-    idris_version = subprocess.run(
-        ["idris2", "--version"],
-        capture_output=True,
-        text=True
-    )
     return {
         "status": "healthy",
-        "idris2": idris_version.stdout.strip() if idris_version.returncode == 0 else "not available"
+        "idris2": await _idris_version()
     }
 
 @app.post("/api/project/init")
@@ -117,9 +387,6 @@ async def initialize_project(request: ProjectInitRequest):
     - Store user prompt and reference documents
     - Save state to disk
     """
-    project_dir = Path(f"./output/{request.project_name}")
-    project_dir.mkdir(parents=True, exist_ok=True)
-
     # WorkflowState 생성 (Spec/WorkflowTypes.idr의 initialState)
     state = create_initial_state(
         project_name=request.project_name,
@@ -127,16 +394,13 @@ async def initialize_project(request: ProjectInitRequest):
         reference_docs=request.reference_docs
     )
 
-    # 상태 저장
+    # 상태 저장 (user_prompt 포함, 프로젝트 디렉토리도 여기서 생성)
     state.save(Path("./output"))
 
-    # Save user prompt (legacy)
-    (project_dir / "prompt.txt").write_text(request.user_prompt)
-
     return {
         "project_name": request.project_name,
         "status": "initialized",
-        "current_phase": str(state.current_phase),
+        "current_phase": state.phase_str(),
         "progress": state.progress(),
         "message": "Project initialized successfully"
     }
@@ -151,14 +415,14 @@ async def upload_reference_docs(
     Supports: PDF, DOCX, images
     """
     project_dir = Path(f"./output/{project_name}/references")
-    project_dir.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(str(project_dir))
+
+    names = [_safe_filename(file.filename) for file in files]
 
     uploaded_files = []
-    for file in files:
-        file_path = project_dir / file.filename
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
+    for file, name in zip(files, names):
+        # 큰 업로드는 이미 임시 파일에 있으므로 1 MiB씩 복사 (전체를 메모리에 올리지 않음)
+        file_path = await asyncio.to_thread(_store_upload, file, name, project_dir)
         uploaded_files.append(str(file_path))
 
     return {
@@ -168,10 +432,12 @@ async def upload_reference_docs(
     }
 
 @app.post("/api/project/{project_name}/generate")
-async def generate_spec(project_name: str, background_tasks: BackgroundTasks):
+async def generate_spec(project_name: str, background_tasks: BackgroundTasks, rebuild: bool = False):
     """
     Start Idris2 specification generation workflow
 
+    rebuild=true: 프로젝트 LLM 응답 캐시(LLM_CACHE=1)를 비우고 처음부터 다시 생성
+
     Phases 2-5 (Spec/WorkflowTypes.idr):
     - Phase 2: Analysis (LangGraph Agent)
     - Phase 3: Spec Generation (LangGraph Agent)
@@ -180,6 +446,7 @@ async def generate_spec(project_name: str, background_tasks: BackgroundTasks):
 
     Returns immediately with task ID
     Frontend should poll /api/project/{name}/status
+    (or subscribe to /api/project/{name}/events)
     """
     # WorkflowState 로드
     state = WorkflowState.load(project_name, Path("./output"))
@@ -208,6 +475,8 @@ async def generate_spec(project_name: str, background_tasks: BackgroundTasks):
         try:
             # Phase 2-5: LangGraph agent 실행
             print(f"\n🚀 Starting workflow for {project_name}...")
+            if rebuild:
+                clear_prompt_cache(project_name)
             updated_state = run_workflow(current_state)
 
             # 상태 저장
@@ -233,13 +502,13 @@ async def generate_spec(project_name: str, background_tasks: BackgroundTasks):
                 error_state.mark_inactive()
                 error_state.save(Path("./output"))
 
-    background_tasks.add_task(run_generation)
+    _run_in_background(background_tasks, run_generation)
 
     # 즉시 응답 반환
     return {
         "project_name": project_name,
         "status": "started",
-        "current_phase": str(state.current_phase),
+        "current_phase": state.phase_str(),
         "message": "Idris2 generation started. Poll /api/project/{name}/status for progress."
     }
 
@@ -265,7 +534,7 @@ async def list_projects():
                 if state:
                     projects.append({
                         "project_name": state.project_name,
-                        "current_phase": str(state.current_phase),
+                        "current_phase": state.phase_str(),
                         "progress": state.progress(),
                         "completed": state.completed,
                         "has_error": state.compile_result is not None and not state.compile_result.success,
@@ -290,6 +559,58 @@ async def get_status(project_name: str) -> GenerationStatus:
     Returns WorkflowState information (Spec/WorkflowTypes.idr)
     Frontend polls this endpoint to track progress
     """
+    return Response(
+        content=await _status_json(project_name),
+        media_type="application/json"
+    )
+
+# 프로젝트별 직렬화된 상태 응답: project_name → ((mtime_ns, size), JSON bytes)
+_STATUS_CACHE: dict = {}
+
+# 진행 중인 상태 파일 로드: (project_name, (mtime_ns, size)) → asyncio.Task
+_STATUS_INFLIGHT: dict = {}
+
+async def _status_json(project_name: str) -> bytes:
+    """
+    GenerationStatus JSON (상태 파일이 바뀌지 않았으면 캐시된 bytes 재사용)
+
+    폴링마다 상태 JSON을 읽고 다시 직렬화하지 않도록 파일 stat으로 변경 여부만 확인한다.
+    캐시가 없을 때 동시에 들어온 요청들은 하나의 로드 작업을 함께 기다린다.
+    """
+    state_file = Path(f"./output/{project_name}/workflow_state.json")
+    try:
+        st = state_file.stat()
+    except FileNotFoundError:
+        _STATUS_CACHE.pop(project_name, None)
+        raise HTTPException(
+            status_code=404,
+            detail=f"Project '{project_name}' not found"
+        )
+
+    signature = (st.st_mtime_ns, st.st_size)
+    cached = _STATUS_CACHE.get(project_name)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    key = (project_name, signature)
+    task = _STATUS_INFLIGHT.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_encode_status(project_name))
+        _STATUS_INFLIGHT[key] = task
+        task.add_done_callback(lambda _: _STATUS_INFLIGHT.pop(key, None))
+
+    # 한 요청이 취소돼도 같은 작업을 기다리는 다른 요청에는 영향 없음
+    body = await asyncio.shield(task)
+    _STATUS_CACHE[project_name] = (signature, body)
+    return body
+
+async def _encode_status(project_name: str) -> bytes:
+    """상태 파일 로드 → GenerationStatus JSON bytes (스레드에서 실행)"""
+    status = await asyncio.to_thread(_build_status, project_name)
+    return status.model_dump_json().encode("utf-8")
+
+def _build_status(project_name: str) -> GenerationStatus:
+    """상태 파일을 읽어 GenerationStatus 구성"""
     # WorkflowState 로드
     state = WorkflowState.load(project_name, Path("./output"))
 
@@ -320,7 +641,7 @@ async def get_status(project_name: str) -> GenerationStatus:
 
     return GenerationStatus(
         project_name=project_name,
-        current_phase=str(state.current_phase),
+        current_phase=state.phase_str(),
         progress=state.progress(),
         completed=state.workflow_complete(),
         is_active=state.is_active,
@@ -332,7 +653,58 @@ async def get_status(project_name: str) -> GenerationStatus:
         error_strategy=error_strategy,
         error_suggestion=error_suggestion,  # 에러 제안 추가
         available_actions=available_actions,
-        logs=state.logs  # 실시간 로그 반환
+        logs=list(state.logs)  # 실시간 로그 반환
+    )
+
+# /events가 상태 파일 변경을 확인하는 주기 (초)와 keep-alive 주석 간격
+STATUS_EVENTS_INTERVAL = 0.5
+STATUS_EVENTS_KEEPALIVE = 15.0
+
+@app.get("/api/project/{project_name}/events")
+async def stream_status(project_name: str, request: Request):
+    """
+    Stream workflow status as Server-Sent Events
+
+    /status 폴링 대신 사용: workflow_state.json의 stat만 주기적으로 확인하고
+    파일이 바뀐 경우에만 상태를 읽어 GenerationStatus JSON을 보낸다.
+    /status는 호환성을 위해 유지한다.
+    """
+    state_file = Path(f"./output/{project_name}/workflow_state.json")
+    if not state_file.exists():
+        raise HTTPException(
+            status_code=404,
+            detail=f"Project '{project_name}' not found"
+        )
+
+    async def events():
+        last_signature = None
+        idle = 0.0
+        while not await request.is_disconnected():
+            try:
+                st = state_file.stat()
+                signature = (st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                signature = None
+
+            if signature is not None and signature != last_signature:
+                last_signature = signature
+                idle = 0.0
+                try:
+                    body = await _status_json(project_name)
+                except HTTPException:
+                    break
+                yield f"data: {body.decode('utf-8')}\n\n"
+            elif idle >= STATUS_EVENTS_KEEPALIVE:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+
+            await asyncio.sleep(STATUS_EVENTS_INTERVAL)
+            idle += STATUS_EVENTS_INTERVAL
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
     )
 
 @app.post("/api/project/{project_name}/draft")
@@ -368,33 +740,19 @@ async def generate_draft(project_name: str):
         )
 
     output_dir = Path(f"./output/{project_name}")
-    output_dir.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(str(output_dir))
+
+    # 이 파일들이 바뀌면 REPL을 다시 로드
+    watch = [
+        Path(f"./Domains/{module_name}.idr"),
+        Path(f"./DomainToDoc/{module_name}.idr"),
+        pipeline_file
+    ]
 
     try:
         # Idris2 Pipeline 실행 (Text, CSV, Markdown)
-
-        # Text 렌더러
-        text_result = subprocess.run(
-            ["idris2", "--exec", "exampleText", str(pipeline_file)],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-
-        # CSV 렌더러
-        csv_result = subprocess.run(
-            ["idris2", "--exec", "exampleCSV", str(pipeline_file)],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-
-        # Markdown 렌더러
-        md_result = subprocess.run(
-            ["idris2", "--exec", "exampleMarkdown", str(pipeline_file)],
-            capture_output=True,
-            text=True,
-            timeout=30
+        text_result, csv_result, md_result = await _run_renderers(
+            pipeline_file, ["exampleText", "exampleCSV", "exampleMarkdown"], watch
         )
 
         # 결과 파일 저장
@@ -403,13 +761,13 @@ async def generate_draft(project_name: str):
         md_file = output_dir / f"{project_name}_draft.md"
 
         if text_result.returncode == 0:
-            text_file.write_text(text_result.stdout, encoding='utf-8')
+            _write_text(text_file, text_result.stdout)
             state.draft_text = text_result.stdout
         if csv_result.returncode == 0:
-            csv_file.write_text(csv_result.stdout, encoding='utf-8')
+            _write_text(csv_file, csv_result.stdout)
             state.draft_csv = csv_result.stdout
         if md_result.returncode == 0:
-            md_file.write_text(md_result.stdout, encoding='utf-8')
+            _write_text(md_file, md_result.stdout)
             state.draft_markdown = md_result.stdout
 
         # Phase 업데이트: DocImpl → Draft
@@ -419,7 +777,7 @@ async def generate_draft(project_name: str):
         return {
             "project_name": project_name,
             "status": "draft_ready",
-            "current_phase": str(state.current_phase),
+            "current_phase": state.phase_str(),
             "message": "Draft files generated successfully",
             "files": {
                 "text": str(text_file) if text_file.exists() else None,
@@ -439,16 +797,18 @@ async def get_draft(project_name: str) -> DraftResponse:
     Retrieve generated draft contents
     """
     output_dir = Path(f"./output/{project_name}")
+    names = {
+        "text_content": f"{project_name}_draft.txt",
+        "markdown_content": f"{project_name}_draft.md",
+        "csv_content": f"{project_name}_schedule.csv",
+    }
 
-    text_file = output_dir / f"{project_name}_draft.txt"
-    md_file = output_dir / f"{project_name}_draft.md"
-    csv_file = output_dir / f"{project_name}_schedule.csv"
+    # 디렉토리 한 번 scan으로 존재 여부 확인 + 있는 파일만 읽기 (이벤트 루프 밖에서)
+    contents = await asyncio.to_thread(_read_output_files, output_dir, list(names.values()))
 
     return DraftResponse(
         project_name=project_name,
-        text_content=text_file.read_text(encoding='utf-8') if text_file.exists() else None,
-        markdown_content=md_file.read_text(encoding='utf-8') if md_file.exists() else None,
-        csv_content=csv_file.read_text(encoding='utf-8') if csv_file.exists() else None
+        **{field: contents.get(name) for field, name in names.items()}
     )
 
 @app.post("/api/project/{project_name}/feedback")
@@ -499,7 +859,7 @@ async def submit_feedback(project_name: str, request: FeedbackRequest, backgroun
             updated_prompt = f"{original_prompt}\n\n[Revision Request]\n{request.feedback}"
             state.user_prompt = updated_prompt
 
-            # LangGraph 재실행
+            # LangGraph 재실행 (피드백이 바뀐 단계부터 새로 생성, 나머지는 응답 캐시 재사용)
             from agent import run_workflow
             updated_state = run_workflow(state)
 
@@ -511,13 +871,13 @@ async def submit_feedback(project_name: str, request: FeedbackRequest, backgroun
             state.compile_result = CompileResult(success=False, error_msg=str(e))
             state.save(Path("./output"))
 
-    background_tasks.add_task(regenerate)
+    _run_in_background(background_tasks, regenerate)
 
     return {
         "project_name": project_name,
         "status": "regenerating",
         "version": state.version_string(),
-        "current_phase": str(state.current_phase),
+        "current_phase": state.phase_str(),
         "message": f"Regenerating specification with feedback (version {state.version_string()})"
     }
 
@@ -552,6 +912,11 @@ async def resume_project(
     if state.current_phase == Phase.INPUT:
         raise HTTPException(status_code=400, detail="No work to resume from input phase")
 
+    # 분석부터 다시 하라고 명시한 경우에만 이전 응답 캐시를 비움
+    # (프롬프트만 바뀐 경우는 분석 요청 내용이 달라 캐시 키도 바뀜)
+    if request.restart_from_analysis:
+        clear_prompt_cache(project_name)
+
     # 프롬프트 업데이트가 있으면 적용
     if request.updated_prompt:
         state.user_prompt = request.updated_prompt
@@ -610,7 +975,7 @@ async def resume_project(
                 error_state.mark_inactive()
                 error_state.save(Path("./output"))
 
-    background_tasks.add_task(resume_workflow)
+    _run_in_background(background_tasks, resume_workflow)
 
     return {
         "project_name": project_name,
@@ -772,7 +1137,7 @@ async def resume_from_autopause(
                 error_state.mark_inactive()
                 error_state.save(Path("./output"))
 
-    background_tasks.add_task(resume_workflow)
+    _run_in_background(background_tasks, resume_workflow)
 
     return {
         "project_name": project_name,
@@ -819,7 +1184,7 @@ async def skip_validation(
         except Exception as e:
             print(f"❌ Skip validation error: {e}")
 
-    background_tasks.add_task(continue_workflow)
+    _run_in_background(background_tasks, continue_workflow)
 
     return {
         "project_name": project_name,
@@ -854,7 +1219,7 @@ async def abort_project(project_name: str):
         "project_name": project_name,
         "status": "aborted",
         "message": "Project execution has been stopped. You can resume it later.",
-        "current_phase": str(state.current_phase)
+        "current_phase": state.phase_str()
     }
 
 @app.post("/api/project/{project_name}/finalize")
@@ -863,7 +1228,7 @@ async def finalize_pdf(project_name: str):
     Generate final PDF output
 
     Phase 9: Finalization
-    - Compile PDF with pdflatex
+    - Compile PDF with pdflatex (LATEX_FORMAT=1: precompiled preamble format)
     - Return download link
     """
     # Check if LaTeX file exists
@@ -871,23 +1236,67 @@ async def finalize_pdf(project_name: str):
     if not tex_file.exists():
         raise HTTPException(status_code=404, detail="LaTeX file not found")
 
+    # 같은 .tex로 이미 PDF를 만들었으면 다시 컴파일하지 않음
+    output_dir = tex_file.parent
+    pdf_file = output_dir / f"{project_name}.pdf"
+    aux_file = output_dir / f"{project_name}.aux"
+    stamp_file = output_dir / f"{project_name}.tex.sha256"
+    tex_hash = hashlib.sha256(tex_file.read_bytes()).hexdigest()
+
+    stamp = stamp_file.read_text().strip() if stamp_file.exists() else None
+    if pdf_file.exists() and stamp == tex_hash:
+        return {
+            "project_name": project_name,
+            "status": "completed",
+            "pdf_path": f"/api/project/{project_name}/download"
+        }
+
     # Compile PDF
-    result = subprocess.run(
-        [
+    # LATEX_FORMAT=1이면 프리앰블은 덤프된 포맷에서 불러오고 본문만 컴파일
+    source_args = [str(tex_file)]
+    if latex_format_enabled():
+        source = tex_file.read_text(encoding="utf-8")
+        body_start = source.find("\\begin{document}")
+        fmt_file = await _latex_format(source[:body_start]) if body_start > 0 else None
+        if fmt_file:
+            body_file = output_dir / f"{project_name}.body.tex"
+            body_file.write_text(source[body_start:], encoding="utf-8")
+            source_args = [
+                f"-fmt={fmt_file.resolve().with_suffix('')}",
+                f"-jobname={project_name}",
+                str(body_file)
+            ]
+
+    async def run_pdflatex(*extra: str) -> Optional[bytes]:
+        """pdflatex 한 패스 실행 후 .aux 내용 반환 (없으면 None)"""
+        result = await _run_command(
             "pdflatex",
-            "-interaction=nonstopmode",
-            "-output-directory=output",
-            str(tex_file)
-        ],
-        capture_output=True,
-        text=True
-    )
-
-    if result.returncode != 0:
-        raise HTTPException(
-            status_code=500,
-            detail=f"PDF compilation failed: {result.stderr}"
+            "-interaction=batchmode",
+            "-halt-on-error",
+            *extra,
+            f"-output-directory={output_dir}",
+            *source_args
         )
+        if result.returncode != 0:
+            raise HTTPException(
+                status_code=500,
+                detail=f"PDF compilation failed: {result.stderr or result.stdout}"
+            )
+        return aux_file.read_bytes() if aux_file.exists() else None
+
+    # .aux가 없으면 (첫 빌드) 목차/상호 참조용 draftmode 패스를 먼저 실행 (PDF 출력 없이 빠름)
+    # 이전 빌드의 .aux가 남아 있으면 그 참조 정보로 바로 최종 패스를 실행하고,
+    # .tex 수정으로 .aux가 바뀌었으면 참조가 맞춰질 때까지 다시 실행
+    aux = aux_file.read_bytes() if aux_file.exists() else None
+    if aux is None:
+        aux = await run_pdflatex("-draftmode")
+    for _ in range(PDFLATEX_MAX_PASSES):
+        new_aux = await run_pdflatex()
+        if new_aux == aux:
+            break
+        aux = new_aux
+
+    stamp_file.write_text(tex_hash)
 
     return {
         "project_name": project_name,
@@ -901,13 +1310,18 @@ async def download_pdf(project_name: str):
     Download final PDF
     """
     pdf_file = Path(f"./output/{project_name}.pdf")
-    if not pdf_file.exists():
+    try:
+        stat_result = pdf_file.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="PDF not found")
 
+    # FileResponse가 Range 요청(206)과 Accept-Ranges를 처리하고, 서버가
+    # http.response.pathsend를 지원하면 파일 전송을 서버(sendfile)에 맡긴다
     return FileResponse(
         path=pdf_file,
         media_type="application/pdf",
-        filename=f"{project_name}.pdf"
+        filename=f"{project_name}.pdf",
+        stat_result=stat_result
     )
 
 # ============================================================
@@ -917,11 +1331,7 @@ async def download_pdf(project_name: str):
 @app.get("/api/debug/idris2")
 async def debug_idris2():
     """Check Idris2 compilation"""
-    result = subprocess.run(
-        ["idris2", "--check", "Spec/WorkflowTypes.idr"],
-        capture_output=True,
-        text=True
-    )
+    result = await _run_command("idris2", "--check", "Spec/WorkflowTypes.idr")
     return {
         "success": result.returncode == 0,
         "stdout": result.stdout,
@@ -2,13 +2,73 @@
 LangGraph 에이전트용 프롬프트 템플릿
 """
 
+import string
+import sys
+from typing import Callable
+
+
+class PromptTemplate(str):
+    """
+    import 시 한 번만 파싱해 두는 프롬프트 템플릿
+
+    str을 상속하므로 그대로 문자열로 쓸 수 있고, format(**kwargs)는
+    str.format과 같은 결과를 미리 나눠 둔 조각을 이어 붙여 만든다.
+    조각 목록을 순회하지 않도록 템플릿마다
+    `"".join((L0, str(kw["a"]), L1, ...))` 한 줄짜리 함수를 생성해 둔다.
+    리터럴 조각은 sys.intern으로 등록해, 다른 템플릿을 이어 붙여 만든 템플릿
+    (ANALYZE_AND_GENERATE_PROMPT 등)과 같은 조각은 한 객체를 공유한다.
+    {name} 형태의 키워드 필드만 지원한다 (변환/포맷 지정자 없음).
+    """
+
+    def __new__(cls, template: str):
+        obj = super().__new__(cls, template)
+        segments = []
+        for literal, field, spec, conversion in string.Formatter().parse(template):
+            if field is not None and (not field.isidentifier() or spec or conversion):
+                raise ValueError(f"unsupported prompt field: {{{field}}}")
+            segments.append((sys.intern(literal), field))
+        obj._segments = tuple(segments)
+        obj._render = _compile_segments(obj._segments)
+        return obj
+
+    def format(self, **kwargs) -> str:
+        return self._render(kwargs)
+
+
+def _compile_segments(segments) -> Callable[[dict], str]:
+    """(리터럴, 필드) 조각 → kwargs dict를 받아 한 번의 join으로 채우는 함수"""
+    namespace = {"_str": str}
+    parts = []
+    for i, (literal, field) in enumerate(segments):
+        if literal:
+            namespace[f"_L{i}"] = literal
+            parts.append(f"_L{i}")
+        if field is not None:
+            parts.append(f"_str(kw[{field!r}])")
+
+    body = f"''.join(({', '.join(parts)},))" if parts else "''"
+    exec(f"def render(kw):\n    return {body}\n", namespace)
+    return namespace["render"]
+
+
+# 여러 프롬프트가 공유하는 조각
+_IDRIS_EXPERT_INTRO = "당신은 Idris2 전문가입니다.\n\n"
+_COMPILE_ERROR_INTRO = "다음 Idris2 코드에 컴파일 에러가 발생했습니다.\n\n"
+_ERROR_MESSAGE_BLOCK = """에러 메시지:
+```
+{error_message}
+```
+"""
+
+
 # 문서 분석 프롬프트
 ANALYZE_DOCUMENT_PROMPT = """당신은 한국 법률/회계 문서 전문가입니다.
 
 첨부된 문서를 분석하여 Idris2 도메인 모델 작성에 필요한 정보를 추출하세요.
 
 문서 유형: {document_type}
-참고 문서: {reference_docs}
+참고 문서: 사용자 메시지에 [파일명] 단위로 첨부
+사용자 요청: 사용자 메시지 끝의 [사용자 요청] (있으면 분석에 반영)
 
 다음 형식으로 분석 결과를 작성하세요:
 
@@ -77,18 +137,8 @@ DocumentRoot
 
 
 # Idris2 코드 생성 프롬프트
-GENERATE_IDRIS_PROMPT = """당신은 Idris2 전문가입니다.
-
-다음 문서 분석 결과를 바탕으로 **완전한 Idris2 도메인 모델**을 작성하세요.
-
-프로젝트명: {project_name}
-
-문서 분석:
-```markdown
-{analysis}
-```
-
-## 🚨 BEFORE YOU START: MCP 서버 활용 (필수!)
+# 코드 작성 지침 (GENERATE_IDRIS_PROMPT와 ANALYZE_AND_GENERATE_PROMPT가 공유)
+_GENERATE_IDRIS_RULES = """## 🚨 BEFORE YOU START: MCP 서버 활용 (필수!)
 
 **CRITICAL**: 코드를 작성하기 **전에** 반드시 MCP 서버에서 가이드라인을 참조하세요!
 
@@ -297,19 +347,52 @@ validAmount a = a.total == plus a.supply a.vat
 출력 형식: 순수 Idris2 코드만 (설명 없이)
 """
 
+GENERATE_IDRIS_PROMPT = _IDRIS_EXPERT_INTRO + """다음 문서 분석 결과를 바탕으로 **완전한 Idris2 도메인 모델**을 작성하세요.
 
-# 에러 수정 프롬프트
-FIX_ERROR_PROMPT = """다음 Idris2 코드에 컴파일 에러가 발생했습니다.
+프로젝트명: {project_name}
 
-현재 코드:
-```idris
-{idris_code}
+문서 분석:
+```markdown
+{analysis}
 ```
 
-에러 메시지:
-```
-{error_message}
-```
+""" + _GENERATE_IDRIS_RULES
+
+
+# 문서 분석 + 코드 생성 통합 프롬프트 (참고 문서가 짧을 때 LLM 호출 1회로 처리)
+# 분석 결과는 같은 응답의 <analysis>에서 나오므로 {analysis} 없음
+# format 인자: document_type, project_name
+ANALYZE_AND_GENERATE_PROMPT = """아래 두 작업을 한 번에 수행하세요.
+
+1. [작업 A] 지침에 따라 첨부된 문서를 분석
+2. [작업 B] 지침에 따라 그 분석 결과로 Idris2 도메인 모델 작성
+
+출력 형식 (태그 밖에는 아무것도 쓰지 마세요):
+<analysis>
+(작업 A 분석 결과 - markdown)
+</analysis>
+<idris>
+(작업 B Idris2 코드만)
+</idris>
+
+# [작업 A] 문서 분석
+
+""" + ANALYZE_DOCUMENT_PROMPT + """
+
+# [작업 B] Idris2 코드 작성
+
+""" + _IDRIS_EXPERT_INTRO + """[작업 A]의 분석 결과를 바탕으로 **완전한 Idris2 도메인 모델**을 작성하세요.
+
+프로젝트명: {project_name}
+
+""" + _GENERATE_IDRIS_RULES
+
+
+# 에러 수정 시스템 프롬프트 (정적 - 수정 시도/프로젝트와 무관하게 동일)
+# 가이드라인과 함께 system 블록으로 보내 prompt caching prefix로 재사용하고,
+# 매번 바뀌는 코드/에러는 FIX_ERROR_PROMPT / FIX_ERROR_WINDOW_PROMPT로 user 메시지에 담는다.
+FIX_ERROR_SYSTEM_PROMPT = """당신은 Idris2 컴파일 에러를 수정하는 전문가입니다.
+사용자 메시지로 코드와 컴파일 에러가 주어집니다.
 
 ## 🚨 STEP 1: MCP 서버로 에러 분석 (필수!)
 
@@ -317,12 +400,12 @@ FIX_ERROR_PROMPT = """다음 Idris2 코드에 컴파일 에러가 발생했습
 
 ```
 1. Use tool: suggest_fix
-   Parameters: {{"error_message": "...", "code": "..."}}
+   Parameters: {"error_message": "...", "code": "..."}
    → Get intelligent fix suggestions
 
 2. If parser error ("Expected 'case', 'if', 'do'..."):
    - Read: idris2://guidelines/project
-   - Or use: get_guideline_section({{"topic": "parser_constraints"}})
+   - Or use: get_guideline_section({"topic": "parser_constraints"})
 
 3. If type error:
    - Search: search_guidelines("type mismatch")
@@ -400,11 +483,41 @@ FIX_ERROR_PROMPT = """다음 Idris2 코드에 컴파일 에러가 발생했습
 3. 필요한 import 추가
 4. 타입 시그니처 확인
 5. 증명 부분 재검토
+"""
+
 
+# 에러 수정 프롬프트 (user 메시지 - 전체 코드 전송)
+FIX_ERROR_PROMPT = _COMPILE_ERROR_INTRO + """현재 코드:
+```idris
+{idris_code}
+```
+
+""" + _ERROR_MESSAGE_BLOCK + """
 **수정된 완전한 Idris2 코드를 제공하세요** (설명 없이 코드만)
 """
 
 
+# 에러 수정 프롬프트 (에러 주변 코드만 전송)
+FIX_ERROR_WINDOW_PROMPT = _COMPILE_ERROR_INTRO + """전체 파일은 {total_lines}줄이며, 아래는 에러 위치 주변인 {start_line}~{end_line}번째 줄입니다.
+
+코드 ({start_line}~{end_line}번째 줄):
+```idris
+{code_window}
+```
+
+""" + _ERROR_MESSAGE_BLOCK + """
+## 수정 지침
+
+1. 에러 메시지 정확히 읽기
+2. 에러가 난 라인 확인 (위 구간 안에 있음)
+3. 타입 시그니처 확인
+4. 증명 부분 재검토
+
+**{start_line}~{end_line}번째 줄을 대체할 수정된 코드만 제공하세요** (설명 없이 코드만)
+- 구간 밖의 코드(module 선언, import 등)는 포함하지 마세요
+- 들여쓰기를 원본과 동일하게 유지하세요
+"""
+
 # 최종 검증 프롬프트
 FINAL_REVIEW_PROMPT = """생성된 Idris2 도메인 모델이 타입 체크를 통과했습니다.
 
@@ -428,9 +541,7 @@ FINAL_REVIEW_PROMPT = """생성된 Idris2 도메인 모델이 타입 체크를 
 
 
 # Documentable 인스턴스 생성 프롬프트 (Phase 5)
-GENERATE_DOCUMENTABLE_PROMPT = """당신은 Idris2 전문가입니다.
-
-다음 도메인 모델에 대한 **Documentable 인스턴스**를 생성하세요.
+GENERATE_DOCUMENTABLE_PROMPT = _IDRIS_EXPERT_INTRO + """다음 도메인 모델에 대한 **Documentable 인스턴스**를 생성하세요.
 
 프로젝트명: {project_name}
 
@@ -549,9 +660,7 @@ Documentable ServiceContract where
 
 
 # 파이프라인 생성 프롬프트 (Phase 5)
-GENERATE_PIPELINE_PROMPT = """당신은 Idris2 전문가입니다.
-
-다음 프로젝트에 대한 **실행 가능한 파이프라인**을 생성하세요.
+GENERATE_PIPELINE_PROMPT = _IDRIS_EXPERT_INTRO + """다음 프로젝트에 대한 **실행 가능한 파이프라인**을 생성하세요.
 
 프로젝트명: {project_name}
 
@@ -641,3 +750,16 @@ Core/Generator.idr의 파이프라인 구조를 참고하세요.
 
 출력 형식: 순수 Idris2 코드만 (설명 없이)
 """
+
+
+# ============================================================================
+# 템플릿 사전 파싱 (.format으로 채우는 프롬프트)
+# ============================================================================
+
+ANALYZE_DOCUMENT_PROMPT = PromptTemplate(ANALYZE_DOCUMENT_PROMPT)
+GENERATE_IDRIS_PROMPT = PromptTemplate(GENERATE_IDRIS_PROMPT)
+ANALYZE_AND_GENERATE_PROMPT = PromptTemplate(ANALYZE_AND_GENERATE_PROMPT)
+FIX_ERROR_PROMPT = PromptTemplate(FIX_ERROR_PROMPT)
+FIX_ERROR_WINDOW_PROMPT = PromptTemplate(FIX_ERROR_WINDOW_PROMPT)
+GENERATE_DOCUMENTABLE_PROMPT = PromptTemplate(GENERATE_DOCUMENTABLE_PROMPT)
+GENERATE_PIPELINE_PROMPT = PromptTemplate(GENERATE_PIPELINE_PROMPT)
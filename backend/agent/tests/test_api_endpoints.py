@@ -7,10 +7,15 @@ from fastapi.testclient import TestClient
 import sys
 from pathlib import Path
 import shutil
+import io
+import hashlib
+import asyncio
+import time
 import tempfile
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import main
 from main import app
 from workflow_state import WorkflowState, Phase, create_initial_state
 
@@ -133,6 +138,27 @@ class TestStatusEndpoint:
         assert response.status_code == 404
         assert "not found" in response.json()["detail"]
 
+    def test_concurrent_status_loads_once(self, monkeypatch):
+        """동시에 들어온 상태 요청은 상태 파일을 한 번만 로드"""
+        calls = []
+        build_status = main._build_status
+
+        def counting_build_status(project_name):
+            calls.append(project_name)
+            time.sleep(0.05)
+            return build_status(project_name)
+
+        monkeypatch.setattr(main, "_build_status", counting_build_status)
+        main._STATUS_CACHE.pop("StatusTest", None)
+
+        async def poll():
+            return await asyncio.gather(*(main._status_json("StatusTest") for _ in range(5)))
+
+        bodies = asyncio.run(poll())
+        assert calls == ["StatusTest"]
+        assert len(set(bodies)) == 1
+        assert not main._STATUS_INFLIGHT
+
 
 class TestFileUpload:
     """파일 업로드 테스트"""
@@ -179,6 +205,80 @@ class TestFileUpload:
             # 임시 파일 삭제
             Path(temp_file.name).unlink()
 
+    def test_reupload_is_deduplicated(self):
+        """같은 내용은 sha256 이름의 파일 하나에 저장되고 파일명은 링크"""
+        for name in ("a.txt", "b.txt", "a.txt"):
+            response = client.post(
+                "/api/project/UploadTest/upload",
+                files={"files": (name, b"Same content", "text/plain")}
+            )
+            assert response.status_code == 200
+
+        references = Path("./output/UploadTest/references")
+        stored = [p for p in references.iterdir() if not p.is_symlink()]
+        assert len(stored) == 1
+        assert stored[0].stem == hashlib.sha256(b"Same content").hexdigest()
+        assert (references / "a.txt").read_bytes() == b"Same content"
+        assert (references / "b.txt").resolve() == stored[0].resolve()
+
+        # 같은 이름으로 다른 내용을 올리면 링크가 새 파일을 가리킴
+        client.post(
+            "/api/project/UploadTest/upload",
+            files={"files": ("a.txt", b"New content", "text/plain")}
+        )
+        assert (references / "a.txt").read_bytes() == b"New content"
+
+    def test_concurrent_same_content_uploads(self):
+        """같은 내용을 다른 이름으로 동시에 저장해도 임시 링크가 충돌하지 않음"""
+        from concurrent.futures import ThreadPoolExecutor
+        from types import SimpleNamespace
+
+        references = Path("./output/UploadTest/references")
+        references.mkdir(parents=True, exist_ok=True)
+        names = [f"doc{i}.txt" for i in range(16)]
+
+        def store(name):
+            upload = SimpleNamespace(file=io.BytesIO(b"Same content"))
+            return main._store_upload(upload, name, references)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            links = list(executor.map(store, names))
+
+        assert all(link.read_bytes() == b"Same content" for link in links)
+        assert not list(references.glob(".*.link"))
+
+    def test_upload_after_directory_removed(self):
+        """mkdir 캐시 이후 디렉토리가 지워져도 업로드는 디렉토리를 다시 만듦"""
+        client.post(
+            "/api/project/UploadTest/upload",
+            files={"files": ("a.txt", b"content", "text/plain")}
+        )
+        shutil.rmtree("./output/UploadTest")
+
+        response = client.post(
+            "/api/project/UploadTest/upload",
+            files={"files": ("a.txt", b"content", "text/plain")}
+        )
+        assert response.status_code == 200
+        assert Path("./output/UploadTest/references/a.txt").read_bytes() == b"content"
+
+    def test_upload_strips_directories(self):
+        """파일명의 디렉토리 부분은 버리고 references/ 안에만 저장"""
+        response = client.post(
+            "/api/project/UploadTest/upload",
+            files={"files": ("../../escape.txt", b"content", "text/plain")}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["uploaded_files"] == [str(Path("output/UploadTest/references/escape.txt"))]
+        assert not Path("./escape.txt").exists()
+
+        response = client.post(
+            "/api/project/UploadTest/upload",
+            files={"files": ("..", b"content", "text/plain")}
+        )
+        assert response.status_code == 400
+
 
 class TestGenerateEndpoint:
     """생성 엔드포인트 테스트"""
@@ -217,6 +317,41 @@ class TestGenerateEndpoint:
         assert "Poll" in data["message"]
 
 
+class TestDownloadEndpoint:
+    """PDF 다운로드 테스트"""
+
+    pdf_file = Path("./output/DownloadTest.pdf")
+
+    def setup_method(self):
+        self.pdf_file.parent.mkdir(parents=True, exist_ok=True)
+        self.pdf_file.write_bytes(b"%PDF-1.5\n" + bytes(range(256)) * 8)
+
+    def teardown_method(self):
+        self.pdf_file.unlink(missing_ok=True)
+
+    def test_download_full(self):
+        response = client.get("/api/project/DownloadTest/download")
+
+        assert response.status_code == 200
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.content == self.pdf_file.read_bytes()
+
+    def test_download_range(self):
+        """Range 요청은 206과 해당 구간만 반환 (이어받기)"""
+        response = client.get(
+            "/api/project/DownloadTest/download",
+            headers={"Range": "bytes=100-199"}
+        )
+
+        assert response.status_code == 206
+        assert response.headers["content-range"].startswith("bytes 100-199/")
+        assert response.content == self.pdf_file.read_bytes()[100:200]
+
+    def test_download_missing(self):
+        response = client.get("/api/project/NoSuchProject/download")
+        assert response.status_code == 404
+
+
 # Note: Draft, Feedback 엔드포인트는 실제 LangGraph 실행이 필요하므로
 # 통합 테스트에서 진행
 
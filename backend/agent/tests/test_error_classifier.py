@@ -0,0 +1,74 @@
+"""
+에러 분류기 테스트
+"""
+
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from error_classifier import (
+    ErrorLevel,
+    classify_error_level,
+    classify_error,
+    split_errors,
+    classify_errors_batch,
+)
+
+
+class TestClassifyErrorLevel:
+    """우선순위: Domain > Proof > Syntax"""
+
+    def test_each_level(self):
+        assert classify_error_level("Error: Undefined name foo") == ErrorLevel.SYNTAX_ERROR
+        assert classify_error_level("Error: Can't solve constraint") == ErrorLevel.PROOF_FAILURE
+        assert classify_error_level("Error: does not have field amount") == ErrorLevel.DOMAIN_ERROR
+        assert classify_error_level("Segmentation fault") == ErrorLevel.UNKNOWN
+
+    def test_domain_wins_over_overlapping_syntax_pattern(self):
+        """"Expected type"은 Syntax의 "Expected"와 겹치지만 Domain으로 분류"""
+        assert classify_error_level("Error: Expected type Nat") == ErrorLevel.DOMAIN_ERROR
+
+    def test_priority_independent_of_position(self):
+        """뒤에 나온 패턴이라도 우선순위가 높으면 선택"""
+        message = "Error: Undefined name x\n...\nError: Can't unify Nat with String"
+        assert classify_error_level(message) == ErrorLevel.PROOF_FAILURE
+
+        message = "Couldn't parse\nMismatch between\nType mismatch between A and B"
+        assert classify_error_level(message) == ErrorLevel.DOMAIN_ERROR
+
+    def test_classify_error_location(self):
+        """에러 위치 추출"""
+        result = classify_error("Domains/MyContract.idr:45:10--45:25\nError: Undefined name x")
+        assert result.level == ErrorLevel.SYNTAX_ERROR
+        assert str(result.location) == "Domains/MyContract.idr:45"
+        assert result.auto_fixable is True
+
+
+class TestBatchClassification:
+    """여러 에러가 섞인 출력 분류"""
+
+    def test_split_and_classify(self):
+        output = (
+            "1/1: Building Domains.Foo (Domains/Foo.idr)\n"
+            "Error: Undefined name bar.\n\n"
+            "Domains/Foo.idr:10:5--10:8\n"
+            "Error: Can't solve constraint between: 3 and 4.\n\n"
+            "Domains/Foo.idr:20:1--20:9\n"
+        )
+        errors = split_errors(output)
+        assert len(errors) == 2
+        assert errors[0].startswith("Error: Undefined name")
+
+        classified = classify_errors_batch(errors)
+        assert [c.level for c in classified] == [ErrorLevel.SYNTAX_ERROR, ErrorLevel.PROOF_FAILURE]
+        assert [c.location.line_number for c in classified] == [10, 20]
+
+    def test_split_without_error_marker(self):
+        assert split_errors("Timeout") == ["Timeout"]
+        assert split_errors("  \n") == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
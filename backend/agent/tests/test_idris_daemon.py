@@ -0,0 +1,148 @@
+"""
+Idris2 IDE 모드 데몬 테스트 (idris2 대신 IDE 프로토콜을 흉내 내는 Python 스크립트 사용)
+"""
+
+import sys
+import subprocess
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from idris_daemon import IdrisDaemon, IdrisDaemonPool, parse_sexp, Symbol
+
+
+# 길이 prefix 프레임으로 :load-file 요청에 응답하는 가짜 idris2 --ide-mode
+FAKE_IDE = r'''
+import re, sys, time
+
+def send(msg):
+    msg += "\n"
+    sys.stdout.write(f"{len(msg):06x}{msg}")
+    sys.stdout.flush()
+
+send("(:protocol-version 2 1)")
+while True:
+    header = sys.stdin.read(6)
+    if len(header) < 6:
+        break
+    body = sys.stdin.read(int(header, 16))
+    path, rid = re.match(r'\(\(:load-file "(.*)"\) (\d+)\)', body).groups()
+    if "Slow" in path:
+        time.sleep(10)
+    send(f'(:write-string "1/1: Building {path} (한글)" {rid})')
+    if "Bad" in path:
+        send(f'(:warning (((:filename "{path}") (:start 3 4) (:end 3 9)) "Undefined name \\"foo\\"." ()) {rid})')
+        send(f'(:return (:error "Error loading file") {rid})')
+    else:
+        send(f'(:return (:ok ()) {rid})')
+'''
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    d = IdrisDaemon([sys.executable, "-c", FAKE_IDE], cwd=tmp_path, timeout=5)
+    yield d
+    d.close()
+
+
+def test_parse_sexp():
+    """리스트/문자열/정수/심볼 파싱"""
+    frame = parse_sexp('(:return (:error "a \\"b\\"\\nc") 12)')
+    assert frame == [":return", [":error", 'a "b"\nc'], 12]
+    assert isinstance(frame[0], Symbol)
+    assert not isinstance(frame[1][1], Symbol)
+
+
+def test_check_success_reuses_process(daemon):
+    """성공한 로드는 (True, 출력)이고 같은 프로세스를 재사용"""
+    ok, output = daemon.check("Domains/Ok.idr")
+    assert ok is True
+    assert "Building Domains/Ok.idr (한글)" in output
+
+    pid = daemon._proc.pid
+    ok, _ = daemon.check("Domains/Ok.idr")
+    assert ok is True
+    assert daemon._proc.pid == pid
+
+
+def test_check_error_has_location(daemon):
+    """:return :error는 실패, :warning 위치는 file:line:col 형식"""
+    ok, output = daemon.check("Domains/Bad.idr")
+    assert ok is False
+    assert 'Domains/Bad.idr:3:4\nUndefined name "foo".' in output
+
+    # 실패 후에도 다음 요청은 정상 처리
+    ok, _ = daemon.check("Domains/Ok.idr")
+    assert ok is True
+
+
+def test_respawn_after_max_calls(tmp_path):
+    """max_calls만큼 사용하면 프로세스 재시작"""
+    d = IdrisDaemon([sys.executable, "-c", FAKE_IDE], cwd=tmp_path, timeout=5, max_calls=2)
+    try:
+        d.check("Domains/Ok.idr")
+        pid = d._proc.pid
+        d.check("Domains/Ok.idr")
+        assert d._proc.pid == pid
+        d.check("Domains/Ok.idr")
+        assert d._proc.pid != pid
+    finally:
+        d.close()
+
+
+def test_check_timeout_kills_process(tmp_path):
+    """응답이 없으면 TimeoutExpired, 다음 호출에서 다시 시작"""
+    d = IdrisDaemon([sys.executable, "-c", FAKE_IDE], cwd=tmp_path, timeout=0.5)
+    try:
+        d.check("Domains/Ok.idr")
+        with pytest.raises(subprocess.TimeoutExpired):
+            d.check("Domains/Slow.idr")
+        assert d._proc is None
+
+        ok, _ = d.check("Domains/Ok.idr")
+        assert ok is True
+    finally:
+        d.close()
+
+
+def test_start_failure_backs_off(tmp_path):
+    """시작 실패 후 START_RETRY_DELAY 동안은 다시 띄우지 않음"""
+    d = IdrisDaemon([str(tmp_path / "missing-idris2")], cwd=tmp_path, timeout=0.5)
+    with pytest.raises(RuntimeError, match="start failed"):
+        d.check("Domains/Ok.idr")
+    with pytest.raises(RuntimeError, match="recently"):
+        d.check("Domains/Ok.idr")
+
+    d.cmd = [sys.executable, "-c", FAKE_IDE]
+    d._retry_after = 0.0
+    try:
+        ok, _ = d.check("Domains/Ok.idr")
+        assert ok is True
+    finally:
+        d.close()
+
+
+def test_pool_checks_in_parallel(tmp_path):
+    """풀의 데몬 수만큼 동시에 검사 (느린 검사가 다른 검사를 막지 않음)"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    pool = IdrisDaemonPool([
+        IdrisDaemon([sys.executable, "-c", FAKE_IDE], cwd=tmp_path, timeout=2)
+        for _ in range(2)
+    ])
+    try:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            slow = executor.submit(pool.check, "Domains/Slow.idr")
+            ok, _ = executor.submit(pool.check, "Domains/Ok.idr").result()
+            assert ok is True
+            with pytest.raises(subprocess.TimeoutExpired):
+                slow.result()
+        assert pool._idle.qsize() == 2
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
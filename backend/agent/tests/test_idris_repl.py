@@ -0,0 +1,125 @@
+"""
+Idris2 REPL 풀 테스트 (idris2 대신 REPL 입출력을 흉내 내는 Python 스크립트 사용)
+"""
+
+import sys
+import asyncio
+import subprocess
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from idris_repl import IdrisRepl
+
+
+# 프롬프트를 줄바꿈 없이 출력하고 :exec / 문자열 리터럴에 응답하는 가짜 idris2 REPL
+FAKE_REPL = r'''
+import sys, time
+
+source = sys.argv[1]
+sys.stdout.write("1/1: Building Pipeline.Fake (Pipeline/Fake.idr)\n")
+prompt = "Main> " if "Bad" in source else "Pipeline.Fake> "
+if "Bad" in source:
+    sys.stdout.write("Error: Undefined name foo.\n")
+sys.stdout.write(prompt)
+sys.stdout.flush()
+for line in sys.stdin:
+    line = line.strip()
+    if line.startswith(":exec "):
+        fn = line[len(":exec "):]
+        if fn == "slow":
+            time.sleep(10)
+        if fn.startswith("example"):
+            sys.stdout.write(f"{fn} 출력 (한글)\n두 번째 줄\n")
+        else:
+            sys.stdout.write(f"Error: Undefined name {fn}.\n")
+    elif line.startswith('"'):
+        sys.stdout.write(line + "\n")
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+'''
+
+
+def make_repl(tmp_path, source="Pipeline/Fake.idr", timeout=5):
+    watched = tmp_path / "Fake.idr"
+    watched.write_text("module Pipeline.Fake")
+    repl = IdrisRepl([sys.executable, "-c", FAKE_REPL, source], [watched], timeout=timeout)
+    return repl, watched
+
+
+def test_exec_reuses_process(tmp_path):
+    """:exec 출력만 돌려주고 같은 프로세스를 재사용"""
+    repl, _ = make_repl(tmp_path)
+
+    async def run():
+        first = await repl.exec("exampleText")
+        pid = repl._proc.pid
+        second = await repl.exec("exampleCSV")
+        same_process = repl._proc.pid == pid
+        await repl.close()
+        return first, second, same_process
+
+    first, second, same_process = asyncio.run(run())
+    assert first.returncode == 0
+    assert first.stdout == "exampleText 출력 (한글)\n두 번째 줄\n"
+    assert second.stdout.startswith("exampleCSV")
+    assert same_process
+
+
+def test_exec_many_in_one_round_trip(tmp_path):
+    """여러 :exec를 한 번에 보내도 명령별 출력이 순서대로 분리됨"""
+    repl, _ = make_repl(tmp_path)
+
+    async def run():
+        results = await repl.exec_many(["exampleText", "missing", "exampleMarkdown"])
+        await repl.close()
+        return results
+
+    text, missing, markdown = asyncio.run(run())
+    assert text.stdout.startswith("exampleText 출력")
+    assert missing.returncode == 1
+    assert markdown.stdout == "exampleMarkdown 출력 (한글)\n두 번째 줄\n"
+
+
+def test_exec_error_and_reload(tmp_path):
+    """Error 출력은 returncode 1, 감시 파일이 바뀌면 REPL 재시작"""
+    repl, watched = make_repl(tmp_path)
+
+    async def run():
+        failed = await repl.exec("missing")
+        pid = repl._proc.pid
+        watched.write_text("module Pipeline.Fake -- changed")
+        ok = await repl.exec("exampleText")
+        restarted = repl._proc.pid != pid
+        await repl.close()
+        return failed, ok, restarted
+
+    failed, ok, restarted = asyncio.run(run())
+    assert failed.returncode == 1
+    assert "Undefined name missing" in failed.stderr
+    assert ok.returncode == 0
+    assert restarted
+
+
+def test_load_failure_raises(tmp_path):
+    """모듈 로드 실패는 RuntimeError (호출자가 idris2 --exec로 대체)"""
+    repl, _ = make_repl(tmp_path, source="Pipeline/Bad.idr")
+    with pytest.raises(RuntimeError, match="could not load"):
+        asyncio.run(repl.exec("exampleText"))
+
+
+def test_timeout_kills_process(tmp_path):
+    repl, _ = make_repl(tmp_path, timeout=0.5)
+
+    async def run():
+        with pytest.raises(subprocess.TimeoutExpired):
+            await repl.exec("slow")
+        return repl._proc
+
+    assert asyncio.run(run()) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,47 @@
+"""
+JSON 헬퍼 테스트 (orjson 유무와 관계없이 같은 결과)
+"""
+
+import json
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import json_utils
+
+
+DATA = {"project_name": "계약서", "logs": ["[12:00:00] 🔵 시작"], "attempts": 2, "error": None}
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(json_utils, "orjson", None)
+    elif json_utils.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+def test_round_trip(backend):
+    for indent in (False, True):
+        data = json_utils.dumps(DATA, indent=indent)
+        assert isinstance(data, bytes)
+        assert "계약서".encode("utf-8") in data
+        assert json_utils.loads(data) == DATA
+
+
+def test_indent_matches_stdlib(backend):
+    """들여쓰기 출력은 json.dumps(indent=2, ensure_ascii=False)와 동일"""
+    expected = json.dumps(DATA, indent=2, ensure_ascii=False).encode("utf-8")
+    assert json_utils.dumps(DATA, indent=True) == expected
+
+
+def test_non_str_keys(backend):
+    """stdlib json처럼 int 키는 문자열 키로 저장"""
+    assert json_utils.loads(json_utils.dumps({1: "a"})) == {"1": "a"}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,186 @@
+"""
+LLM 응답 캐시 테스트
+"""
+
+import pytest
+from pathlib import Path
+import tempfile
+import shutil
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import llm_cache
+
+
+class TestLLMCache:
+    """exact-match 캐시 테스트"""
+
+    def setup_method(self):
+        """임시 캐시 디렉토리 사용"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.original_dir = llm_cache.CACHE_DIR
+        llm_cache.CACHE_DIR = self.temp_dir
+
+    def teardown_method(self):
+        """정리"""
+        llm_cache.CACHE_DIR = self.original_dir
+        if self.temp_dir.exists():
+            shutil.rmtree(self.temp_dir)
+
+    def test_make_key_deterministic(self):
+        """동일 요청은 동일 키"""
+        key1 = llm_cache.make_key("system", "user", 0.0, "model")
+        key2 = llm_cache.make_key("system", "user", 0.0, "model")
+        assert key1 == key2
+
+        # 모델/온도가 다르면 다른 키
+        assert key1 != llm_cache.make_key("system", "user", 0.0, "other-model")
+        assert key1 != llm_cache.make_key("system", "user", 0.5, "model")
+
+    def test_put_and_get(self):
+        """저장 후 조회"""
+        assert llm_cache.get("missing") is None
+
+        llm_cache.put("abc", "응답 텍스트")
+        assert llm_cache.get("abc") == "응답 텍스트"
+
+    def test_lru_eviction(self, monkeypatch):
+        """MAX_ENTRIES 초과 시 가장 오래 사용되지 않은 항목 삭제"""
+        monkeypatch.setattr(llm_cache, "MAX_ENTRIES", 2)
+
+        llm_cache.put("a", "A")
+        llm_cache.put("b", "B")
+        assert llm_cache.get("a") == "A"  # a 사용 → b가 가장 오래됨
+        llm_cache.put("c", "C")
+
+        assert llm_cache.get("a") == "A"
+        assert llm_cache.get("b") is None
+        assert llm_cache.get("c") == "C"
+
+    def test_decorator_hit(self, monkeypatch):
+        """LLM_CACHE=1이면 두 번째 호출은 캐시에서 반환"""
+        monkeypatch.setenv("LLM_CACHE", "1")
+        calls = []
+
+        @llm_cache.cached_completion(model="test-model")
+        def fake_llm(system_prompt, user_message="", temperature=0.0, use_cached_guidelines=True):
+            calls.append(system_prompt)
+            return f"response to {system_prompt}"
+
+        assert fake_llm("prompt") == "response to prompt"
+        assert fake_llm("prompt") == "response to prompt"
+        assert len(calls) == 1
+
+    def test_decorator_skips_nonzero_temperature(self, monkeypatch):
+        """temperature > 0 호출은 캐시하지 않음"""
+        monkeypatch.setenv("LLM_CACHE", "1")
+        calls = []
+
+        @llm_cache.cached_completion(model="test-model")
+        def fake_llm(system_prompt, user_message="", temperature=0.0, use_cached_guidelines=True):
+            calls.append(system_prompt)
+            return "response"
+
+        fake_llm("prompt", temperature=0.7)
+        fake_llm("prompt", temperature=0.7)
+        assert len(calls) == 2
+
+    def test_structural_hit_substitutes_template_vars(self, monkeypatch):
+        """템플릿 변수만 다른 요청은 구조적 캐시에서 값을 바꿔 반환"""
+        monkeypatch.setenv("LLM_CACHE", "1")
+        calls = []
+
+        @llm_cache.cached_completion(model="test-model")
+        def fake_llm(system_prompt, user_message="", temperature=0.0, use_cached_guidelines=True):
+            calls.append(system_prompt)
+            return "module Pipeline.AlphaContract"
+
+        first = fake_llm(
+            "Generate Pipeline.AlphaContract",
+            template_vars={"project_name": "AlphaContract"}
+        )
+        second = fake_llm(
+            "Generate Pipeline.BetaContract",
+            template_vars={"project_name": "BetaContract"}
+        )
+
+        assert first == "module Pipeline.AlphaContract"
+        assert second == "module Pipeline.BetaContract"
+        assert len(calls) == 1
+
+    def test_mask_only_whole_words(self):
+        """변수 값이 더 긴 식별자의 일부일 때는 마스킹하지 않음"""
+        masked = llm_cache.mask_template_vars(
+            "module Pipeline.MyContract\nimport MyContractTest",
+            {"project_name": "MyContract"}
+        )
+        assert masked == "module Pipeline.⟦project_name⟧\nimport MyContractTest"
+
+    def test_decorator_disabled_by_default(self, monkeypatch):
+        """LLM_CACHE 미설정 시 항상 호출"""
+        monkeypatch.delenv("LLM_CACHE", raising=False)
+        calls = []
+
+        @llm_cache.cached_completion(model="test-model")
+        def fake_llm(system_prompt, user_message="", temperature=0.0, use_cached_guidelines=True):
+            calls.append(system_prompt)
+            return "response"
+
+        fake_llm("prompt")
+        fake_llm("prompt")
+        assert len(calls) == 2
+
+    def test_project_cache_dir(self, monkeypatch):
+        """cache_dir를 넘기면 전역 캐시 대신 그 위치에만 캐시"""
+        monkeypatch.setenv("LLM_CACHE", "1")
+        calls = []
+
+        @llm_cache.cached_completion(model="test-model")
+        def fake_llm(system_prompt, user_message="", temperature=0.0, use_cached_guidelines=True):
+            calls.append(system_prompt)
+            return "response"
+
+        project_dir = self.temp_dir / "MyProject" / "prompt_cache"
+        fake_llm("prompt", cache_dir=project_dir)
+        fake_llm("prompt", cache_dir=project_dir)
+        assert len(calls) == 1
+        assert (project_dir / "responses.sqlite3").exists()
+        assert llm_cache.get(llm_cache.make_key("prompt", "", 0.0, "test-model")) is None
+
+        # 다른 프로젝트는 별도 캐시
+        fake_llm("prompt", cache_dir=self.temp_dir / "Other" / "prompt_cache")
+        assert len(calls) == 2
+
+    def test_project_cache_dir_requires_opt_in(self, monkeypatch):
+        """LLM_CACHE 미설정이면 cache_dir가 있어도 항상 호출"""
+        monkeypatch.delenv("LLM_CACHE", raising=False)
+        calls = []
+
+        @llm_cache.cached_completion(model="test-model")
+        def fake_llm(system_prompt, user_message="", temperature=0.0, use_cached_guidelines=True):
+            calls.append(system_prompt)
+            return "response"
+
+        project_dir = self.temp_dir / "MyProject" / "prompt_cache"
+        fake_llm("prompt", cache_dir=project_dir)
+        fake_llm("prompt", cache_dir=project_dir)
+        assert len(calls) == 2
+
+    def test_use_cache_false_bypasses(self, monkeypatch):
+        """use_cache=False면 LLM_CACHE=1이어도 캐시된 응답을 쓰지 않음"""
+        monkeypatch.setenv("LLM_CACHE", "1")
+        calls = []
+
+        @llm_cache.cached_completion(model="test-model")
+        def fake_llm(system_prompt, user_message="", temperature=0.0, use_cached_guidelines=True):
+            calls.append(system_prompt)
+            return "response"
+
+        fake_llm("prompt")
+        fake_llm("prompt", use_cache=False)
+        assert len(calls) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
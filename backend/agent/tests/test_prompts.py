@@ -0,0 +1,66 @@
+"""
+프롬프트 템플릿 테스트
+"""
+
+import string
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import prompts
+from prompts import PromptTemplate
+
+
+TEMPLATES = [
+    name for name in dir(prompts)
+    if name.endswith("_PROMPT") and isinstance(getattr(prompts, name), PromptTemplate)
+]
+
+
+@pytest.mark.parametrize("name", TEMPLATES)
+def test_format_matches_str_format(name):
+    """사전 파싱한 format 결과는 str.format과 동일"""
+    template = getattr(prompts, name)
+    fields = {
+        field: f"<{field} 값 {{중괄호}}>"
+        for _, field, _, _ in string.Formatter().parse(template)
+        if field
+    }
+    assert template.format(**fields) == str.format(template, **fields)
+
+
+@pytest.mark.parametrize("template", ["", "고정 문구", "{a}", "{a}{b}", "앞 {a} 뒤 {{이스케이프}}"])
+def test_edge_templates(template):
+    """필드만/리터럴만/빈 템플릿도 str.format과 동일"""
+    assert PromptTemplate(template).format(a="A", b=1) == template.format(a="A", b=1)
+
+
+def test_shared_segments_are_interned():
+    """이어 붙여 만든 템플릿의 리터럴 조각은 원본 템플릿의 조각과 같은 객체"""
+    combined = {literal for literal, _ in prompts.ANALYZE_AND_GENERATE_PROMPT._segments}
+    shared = [
+        literal for literal, _ in prompts.GENERATE_IDRIS_PROMPT._segments
+        if literal in combined
+    ]
+    assert shared
+    by_value = {literal: literal for literal, _ in prompts.ANALYZE_AND_GENERATE_PROMPT._segments}
+    assert all(by_value[literal] is literal for literal in shared)
+
+
+def test_missing_field_raises():
+    with pytest.raises(KeyError):
+        PromptTemplate("프로젝트: {project_name}").format()
+
+
+def test_unsupported_field_rejected():
+    """위치 인자, 포맷 지정자는 지원하지 않음"""
+    with pytest.raises(ValueError):
+        PromptTemplate("{}")
+    with pytest.raises(ValueError):
+        PromptTemplate("{amount:>10}")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,68 @@
+"""
+Idris2 타입 체크 캐시 테스트
+"""
+
+import pytest
+from pathlib import Path
+import tempfile
+import shutil
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import typecheck_cache
+
+
+class TestTypecheckCache:
+    """내용 해시 기반 타입 체크 캐시 테스트"""
+
+    def setup_method(self):
+        """임시 소스 트리 + 캐시 디렉토리"""
+        self.root = Path(tempfile.mkdtemp())
+        self.original_dir = typecheck_cache.CACHE_DIR
+        typecheck_cache.CACHE_DIR = self.root / ".cache"
+        typecheck_cache._MEMORY.clear()
+
+        (self.root / "Domains").mkdir()
+        (self.root / "Pipeline").mkdir()
+        (self.root / "Domains" / "Foo.idr").write_text("module Domains.Foo\n")
+        (self.root / "Pipeline" / "Foo.idr").write_text(
+            "module Pipeline.Foo\n\nimport Domains.Foo\nimport Data.List\n"
+        )
+
+    def teardown_method(self):
+        """정리"""
+        typecheck_cache.CACHE_DIR = self.original_dir
+        typecheck_cache._MEMORY.clear()
+        shutil.rmtree(self.root)
+
+    def test_source_closure_includes_local_imports(self):
+        """로컬 모듈만 포함 (Data.List 같은 패키지 모듈 제외)"""
+        closure = typecheck_cache.source_closure(self.root / "Pipeline" / "Foo.idr", self.root)
+        assert closure == sorted([
+            self.root / "Domains" / "Foo.idr",
+            self.root / "Pipeline" / "Foo.idr",
+        ])
+
+    def test_key_changes_with_dependency_and_version(self):
+        """import한 모듈이나 idris2 버전이 바뀌면 다른 키"""
+        key = typecheck_cache.make_key("Pipeline/Foo.idr", self.root, "0.7.0")
+        assert key == typecheck_cache.make_key("Pipeline/Foo.idr", self.root, "0.7.0")
+        assert key != typecheck_cache.make_key("Pipeline/Foo.idr", self.root, "0.8.0")
+
+        (self.root / "Domains" / "Foo.idr").write_text("module Domains.Foo\n\nx : Nat\n")
+        assert key != typecheck_cache.make_key("Pipeline/Foo.idr", self.root, "0.7.0")
+
+        assert typecheck_cache.make_key("Missing.idr", self.root, "0.7.0") is None
+
+    def test_put_and_get_from_disk(self):
+        """저장 후 프로세스 캐시가 비어도 디스크에서 조회"""
+        assert typecheck_cache.get("abc") is None
+
+        typecheck_cache.put("abc", False, "Error: 에러", "0.7.0")
+        typecheck_cache._MEMORY.clear()
+        assert typecheck_cache.get("abc") == (False, "Error: 에러")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -40,6 +40,13 @@ class TestPhase:
         assert str(Phase.INPUT) == "Phase 1: Input Collection"
         assert str(Phase.FINAL) == "Phase 9: Finalization"
 
+    def test_phase_str_matches_state(self):
+        """WorkflowState.phase_str()는 모든 Phase에서 str()과 동일"""
+        state = create_initial_state("Test", "prompt", [])
+        for phase in Phase:
+            state.current_phase = phase
+            assert state.phase_str() == str(phase)
+
 
 class TestWorkflowState:
     """WorkflowState 테스트"""
@@ -60,6 +67,13 @@ class TestWorkflowState:
         assert state.compile_attempts == 0
         assert state.completed is False
 
+    def test_slots(self):
+        """슬롯 dataclass: 인스턴스 __dict__ 없음, MAX_COMPILE_ATTEMPTS는 필드가 아님"""
+        state = create_initial_state("TestProject", "prompt", [])
+        assert not hasattr(state, "__dict__")
+        assert "MAX_COMPILE_ATTEMPTS" not in WorkflowState.__slots__
+        assert state.MAX_COMPILE_ATTEMPTS == 5
+
     def test_input_phase_complete(self):
         """Phase 1 완료 조건 테스트"""
         state = create_initial_state("Test", "prompt", ["doc.pdf"])
@@ -258,6 +272,18 @@ class TestStatePersistence:
         assert loaded_state.current_phase == Phase.ANALYSIS
         assert loaded_state.compile_attempts == 2
 
+    def test_concurrent_saves_same_project(self):
+        """같은 프로젝트를 여러 스레드가 동시에 저장해도 링크 교체가 충돌하지 않음"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        states = [create_initial_state("Concurrent", f"prompt {i}", []) for i in range(16)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda state: state.save(self.temp_dir), states))
+
+        project_dir = self.temp_dir / "Concurrent"
+        assert WorkflowState.load("Concurrent", self.temp_dir) is not None
+        assert not list(project_dir.glob(".*.link"))
+
     def test_load_nonexistent(self):
         """존재하지 않는 프로젝트 로드 시 None 반환"""
         loaded = WorkflowState.load("NonExistent", self.temp_dir)
@@ -293,6 +319,117 @@ class TestStatePersistence:
         assert loaded.user_satisfaction.satisfied is False
         assert loaded.user_satisfaction.revision_request == "Change the contract terms"
 
+    def test_save_skips_unchanged_state(self):
+        """같은 내용이면 다시 쓰지 않고, 바뀌면 임시 파일 없이 교체"""
+        state = create_initial_state("Test", "prompt", ["doc.pdf"])
+        state.save(self.temp_dir)
+        state_file = self.temp_dir / "Test" / "workflow_state.json"
+        mtime = state_file.stat().st_mtime_ns
+
+        state.save(self.temp_dir)
+        assert state_file.stat().st_mtime_ns == mtime
+
+        state.compile_attempts = 1
+        state.save(self.temp_dir)
+        assert WorkflowState.load("Test", self.temp_dir).compile_attempts == 1
+        assert sorted(p.name for p in state_file.parent.iterdir()) == [
+            "workflow_state.json", "workflow_state.v1.json"
+        ]
+
+    def test_save_same_bytes_without_orjson(self, monkeypatch):
+        """orjson이 없어도 (stdlib json) 같은 상태 파일"""
+        import workflow_state
+        state = create_initial_state("Test", "프롬프트", ["doc.pdf"])
+        state.compile_result = CompileResult(success=False, error_msg="Error")
+        state.user_satisfaction = UserSatisfaction(satisfied=True)
+        state.add_log("로그")
+
+        state.save(self.temp_dir)
+        state_file = self.temp_dir / "Test" / "workflow_state.json"
+        expected = state_file.read_bytes()
+        assert b'"current_phase": "InputPhase"' in expected
+
+        state_file.resolve().unlink()
+        monkeypatch.setattr(workflow_state.json_utils, "orjson", None)
+        state.save(self.temp_dir)
+        assert state_file.read_bytes() == expected
+
+    def test_versioned_state_files(self):
+        """버전마다 별도 파일, workflow_state.json은 최신 버전 링크"""
+        state = create_initial_state("Test", "prompt", [])
+        state.save(self.temp_dir)
+        state.increment_version()
+        state.feedback_history.append("수정 요청")
+        state.save(self.temp_dir)
+
+        state_file = self.temp_dir / "Test" / "workflow_state.json"
+        assert state_file.is_symlink()
+        assert state_file.resolve().name == "workflow_state.v2.json"
+        assert WorkflowState.load("Test", self.temp_dir).version == 2
+        assert WorkflowState.load("Test", self.temp_dir, version=1).feedback_history == []
+
+        for _ in range(12):
+            state.increment_version()
+            state.save(self.temp_dir)
+        versions = sorted(p.name for p in state_file.parent.glob("workflow_state.v*.json"))
+        assert len(versions) == 10
+        assert WorkflowState.load("Test", self.temp_dir, version=1) is None
+
+    def test_large_state_compressed(self):
+        """큰 상태는 zstd로 저장되고 그대로 로드됨, 작은 상태는 평문 JSON"""
+        pytest.importorskip("zstandard")
+        state = create_initial_state("Test", "prompt", [])
+        state.save(self.temp_dir)
+        state_file = self.temp_dir / "Test" / "workflow_state.json"
+        assert state_file.read_bytes().startswith(b"{")
+
+        state.feedback_history = [f"피드백 {i}: " + "수정 요청 " * 50 for i in range(200)]
+        state.save(self.temp_dir)
+        assert not state_file.read_bytes().startswith(b"{")
+
+        loaded = WorkflowState.load("Test", self.temp_dir)
+        assert loaded.feedback_history == state.feedback_history
+
+    def test_msgpack_state_round_trip(self, monkeypatch):
+        """STATE_FORMAT=msgpack이면 msgpack으로 저장되고 그대로 로드됨"""
+        pytest.importorskip("msgpack")
+        monkeypatch.setenv("STATE_FORMAT", "msgpack")
+        state = create_initial_state("Test", "프롬프트", ["doc.pdf"])
+        state.compile_result = CompileResult(success=False, error_msg="Error")
+        state.add_log("로그")
+        state.save(self.temp_dir)
+
+        state_file = self.temp_dir / "Test" / "workflow_state.json"
+        assert not state_file.read_bytes().startswith(b"{")
+
+        loaded = WorkflowState.load("Test", self.temp_dir)
+        assert loaded.current_phase == Phase.INPUT
+        assert loaded.compile_result.error_msg == "Error"
+        assert list(loaded.logs) == list(state.logs)
+
+    def test_log_timestamp_format(self):
+        """로그는 "[HH:MM:SS] 메시지" 형식"""
+        import re
+        state = create_initial_state("Test", "prompt", [])
+        state.add_log("첫 번째")
+        state.add_log("두 번째")
+        assert all(re.fullmatch(r"\[\d{2}:\d{2}:\d{2}\] .+", log) for log in state.logs)
+
+    def test_logs_capped_and_round_trip(self):
+        """로그는 최근 100개만 유지되고 저장/로드 후에도 링 버퍼"""
+        state = create_initial_state("Test", "prompt", [])
+        for i in range(150):
+            state.add_log(f"step {i}")
+
+        assert len(state.logs) == 100
+        assert state.logs[0].endswith("step 50")
+
+        state.save(self.temp_dir)
+        loaded = WorkflowState.load("Test", self.temp_dir)
+        assert list(loaded.logs) == list(state.logs)
+        loaded.add_log("step 150")
+        assert len(loaded.logs) == 100
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,147 @@
+"""
+Idris2 타입 체크 결과 캐시
+
+타입 체크 결과는 (파일 내용 + 파일이 import하는 로컬 모듈 내용 + idris2 버전)으로
+결정되므로, 이 값들의 해시가 같으면 idris2를 다시 실행하지 않고 이전 결과를 쓴다.
+수정 루프가 이전 시도와 같은 코드를 만들거나, 같은 파일을 다른 실행에서 다시
+검사하는 경우에 해당한다.
+
+프로세스 내 LRU + ./.cache/idris_typecheck/ 디스크 캐시.
+TYPECHECK_CACHE=0 환경 변수로 비활성화.
+"""
+
+import os
+import re
+import hashlib
+import functools
+import subprocess
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from backend.agent import json_utils
+
+
+# 캐시 저장 위치 (프로세스 cwd 기준, LLM 캐시와 동일한 규칙)
+CACHE_DIR = Path("./.cache/idris_typecheck")
+
+# 프로세스 내 캐시 크기
+MEMORY_CACHE_SIZE = 256
+
+_IMPORT_RE = re.compile(r"^import\s+(?:public\s+)?([\w.]+)", re.MULTILINE)
+
+_MEMORY: "OrderedDict[str, Tuple[bool, str]]" = OrderedDict()
+_MEMORY_LOCK = threading.Lock()
+
+
+def cache_enabled() -> bool:
+    """TYPECHECK_CACHE=0이 아니면 캐시 사용"""
+    return os.getenv("TYPECHECK_CACHE", "1") != "0"
+
+
+@functools.lru_cache(maxsize=1)
+def idris_version() -> Optional[str]:
+    """idris2 --version 출력 (idris2가 없으면 None)"""
+    try:
+        result = subprocess.run(
+            ["idris2", "--version"],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip()
+
+
+def source_closure(file_path: Path, root: Path) -> List[Path]:
+    """
+    파일 + 파일이 (재귀적으로) import하는 로컬 모듈 목록
+
+    import Domains.MyContract → <root>/Domains/MyContract.idr (존재할 때만)
+    Prelude/base/contrib 같은 패키지 모듈은 idris2 버전으로 대신 구분한다.
+    """
+    seen = {file_path}
+    pending = [file_path]
+    while pending:
+        current = pending.pop()
+        try:
+            source = current.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            continue
+        for module in _IMPORT_RE.findall(source):
+            dep = root / (module.replace(".", "/") + ".idr")
+            if dep not in seen and dep.is_file():
+                seen.add(dep)
+                pending.append(dep)
+    return sorted(seen)
+
+
+def make_key(file_path: str, root: Path, version: str) -> Optional[str]:
+    """
+    캐시 키 생성 (sha256)
+
+    Returns:
+        키, 대상 파일을 읽을 수 없으면 None
+    """
+    target = root / file_path
+    if not target.is_file():
+        return None
+
+    h = hashlib.sha256()
+    h.update(version.encode("utf-8"))
+    h.update(b"\x00" + file_path.encode("utf-8"))
+    for path in source_closure(target, root):
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        h.update(b"\x00" + str(path.relative_to(root)).encode("utf-8") + b"\x00")
+        h.update(hashlib.sha256(data).digest())
+    return h.hexdigest()
+
+
+def get(key: str) -> Optional[Tuple[bool, str]]:
+    """캐시 조회 (없으면 None)"""
+    with _MEMORY_LOCK:
+        if key in _MEMORY:
+            _MEMORY.move_to_end(key)
+            return _MEMORY[key]
+
+    try:
+        entry = json_utils.loads((CACHE_DIR / f"{key}.json").read_bytes())
+        result = (bool(entry["success"]), entry["output"])
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+
+    _remember(key, result)
+    return result
+
+
+def put(key: str, success: bool, output: str, version: str) -> None:
+    """캐시 저장 (임시 파일 → os.replace)"""
+    _remember(key, (success, output))
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        # 직렬화한 bytes를 한 번에 기록 (인코더가 조각조각 write하지 않음)
+        with os.fdopen(fd, "wb") as f:
+            f.write(json_utils.dumps(
+                {"success": success, "output": output, "idris_version": version}
+            ))
+        os.replace(tmp_path, CACHE_DIR / f"{key}.json")
+    except OSError as e:
+        print(f"   ⚠️ Failed to write typecheck cache: {e}")
+
+
+def _remember(key: str, result: Tuple[bool, str]) -> None:
+    """프로세스 내 LRU에 저장"""
+    with _MEMORY_LOCK:
+        _MEMORY[key] = result
+        _MEMORY.move_to_end(key)
+        while len(_MEMORY) > MEMORY_CACHE_SIZE:
+            _MEMORY.popitem(last=False)
@@ -3,11 +3,51 @@
 Spec/WorkflowTypes.idr의 Python 구현
 """
 
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, fields, is_dataclass
 from enum import Enum
-from typing import Optional, List
+from typing import ClassVar, Deque, Dict, Optional, List, Tuple
+from collections import deque
 from pathlib import Path
-import json
+from types import MappingProxyType
+import os
+import time
+import uuid
+import hashlib
+import functools
+from datetime import datetime
+import tempfile
+
+from backend.agent import json_utils
+
+try:
+    import zstandard
+except ImportError:  # 선택 의존성
+    zstandard = None
+
+try:
+    import msgpack
+except ImportError:  # 선택 의존성
+    msgpack = None
+
+
+# 실시간 로그 보관 개수
+MAX_LOGS = 100
+
+# 이보다 큰 상태 파일은 zstd(level 1)로 압축 저장 (zstandard 설치 시)
+COMPRESS_MIN_BYTES = 64 * 1024
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# msgpack map의 첫 바이트 (fixmap, map16, map32). JSON 상태 파일은 '{'로 시작
+_MSGPACK_MAP_MARKERS = frozenset(range(0x80, 0x90)) | {0xde, 0xdf}
+
+# 프로젝트별로 보관할 버전 상태 파일 수 (workflow_state.v{N}.json)
+MAX_STATE_VERSIONS = 10
+
+# 마지막으로 저장한 상태 파일 정보: 경로 → (blake2b, mtime_ns, size)
+_SAVED_FILES: Dict[str, Tuple[bytes, int, int]] = {}
+
+# 마지막 로그 타임스탬프: (epoch 초, "HH:MM:SS")
+_LOG_TIMESTAMP: Tuple[int, str] = (0, "")
 
 
 # ============================================================================
@@ -29,19 +69,48 @@ class Phase(Enum):
 
     def __str__(self):
         """Show Phase"""
-        labels = {
-            Phase.INPUT: "Phase 1: Input Collection",
-            Phase.ANALYSIS: "Phase 2: Analysis",
-            Phase.SPEC_GENERATION: "Phase 3: Spec Generation",
-            Phase.COMPILATION: "Phase 4: Compilation",
-            Phase.ERROR_HANDLING: "Phase 4b: Error Handling",
-            Phase.DOC_IMPL: "Phase 5: Document Implementation",
-            Phase.DRAFT: "Phase 6: Draft Generation",
-            Phase.FEEDBACK: "Phase 7: User Feedback",
-            Phase.REFINEMENT: "Phase 8: Refinement",
-            Phase.FINAL: "Phase 9: Finalization"
-        }
-        return labels[self]
+        return _PHASE_STR[self]
+
+
+# Phase → 표시 문자열 (status 폴링마다 쓰이므로 import 시 한 번만 생성)
+_PHASE_STR = MappingProxyType({
+    Phase.INPUT: "Phase 1: Input Collection",
+    Phase.ANALYSIS: "Phase 2: Analysis",
+    Phase.SPEC_GENERATION: "Phase 3: Spec Generation",
+    Phase.COMPILATION: "Phase 4: Compilation",
+    Phase.ERROR_HANDLING: "Phase 4b: Error Handling",
+    Phase.DOC_IMPL: "Phase 5: Document Implementation",
+    Phase.DRAFT: "Phase 6: Draft Generation",
+    Phase.FEEDBACK: "Phase 7: User Feedback",
+    Phase.REFINEMENT: "Phase 8: Refinement",
+    Phase.FINAL: "Phase 9: Finalization"
+})
+
+# Phase → 다음 Phase (Spec/WorkflowTypes.idr의 전이)
+_NEXT_PHASE = MappingProxyType({
+    Phase.INPUT: Phase.ANALYSIS,
+    Phase.ANALYSIS: Phase.SPEC_GENERATION,
+    Phase.SPEC_GENERATION: Phase.COMPILATION,
+    Phase.COMPILATION: Phase.DOC_IMPL,
+    Phase.DOC_IMPL: Phase.DRAFT,
+    Phase.DRAFT: Phase.FEEDBACK,
+    Phase.FEEDBACK: Phase.REFINEMENT,
+    Phase.REFINEMENT: Phase.DRAFT,  # 루프!
+    Phase.FINAL: Phase.FINAL  # 종료
+})
+
+# Phase → 진행률 (0.0 ~ 1.0)
+_PHASE_PROGRESS = MappingProxyType({
+    Phase.INPUT: 0.0,
+    Phase.ANALYSIS: 0.1,
+    Phase.SPEC_GENERATION: 0.2,
+    Phase.COMPILATION: 0.4,
+    Phase.DOC_IMPL: 0.6,
+    Phase.DRAFT: 0.7,
+    Phase.FEEDBACK: 0.8,
+    Phase.REFINEMENT: 0.85,
+    Phase.FINAL: 1.0
+})
 
 
 # ============================================================================
@@ -90,7 +159,7 @@ class ResumeOption(Enum):
 # CompileResult
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class CompileResult:
     """컴파일 결과"""
     success: bool
@@ -106,7 +175,7 @@ class CompileResult:
 # UserSatisfaction
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class UserSatisfaction:
     """사용자 만족도"""
     satisfied: bool
@@ -122,7 +191,7 @@ class UserSatisfaction:
 # WorkflowState (핵심!)
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class WorkflowState:
     """
     워크플로우 상태
@@ -177,13 +246,18 @@ class WorkflowState:
     completed: bool = False
 
     # 실시간 로그 (프론트엔드 모니터링용)
-    logs: List[str] = field(default_factory=list)  # 최근 100개 로그 유지
+    logs: Deque[str] = field(default_factory=lambda: deque(maxlen=MAX_LOGS))  # 최근 100개 로그 유지
 
     # 활동 추적 (백엔드 활동 상태)
     is_active: bool = False  # 현재 작업 중인지
     last_activity: Optional[str] = None  # 마지막 활동 시간 (ISO format)
     current_action: Optional[str] = None  # 현재 수행 중인 작업
 
+    def __post_init__(self):
+        # load()나 생성자로 넘어온 list도 링 버퍼로 (오래된 로그는 자동 폐기)
+        if not isinstance(self.logs, deque) or self.logs.maxlen != MAX_LOGS:
+            self.logs = deque(self.logs, maxlen=MAX_LOGS)
+
     # ========================================================================
     # 상태 검증 (Spec/WorkflowTypes.idr의 검증 함수들)
     # ========================================================================
@@ -238,22 +312,15 @@ class WorkflowState:
 
     def add_log(self, message: str) -> None:
         """
-        로그 메시지 추가 (최근 100개만 유지)
+        로그 메시지 추가 (deque(maxlen=100)라 오래된 로그는 자동 폐기)
 
         Args:
             message: 로그 메시지
         """
-        from datetime import datetime
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        log_entry = f"[{timestamp}] {message}"
-        self.logs.append(log_entry)
-        # 최근 100개만 유지
-        if len(self.logs) > 100:
-            self.logs = self.logs[-100:]
+        self.logs.append(f"[{log_timestamp()}] {message}")
 
     def mark_active(self, action: str):
         """백엔드 활동 시작 표시"""
-        from datetime import datetime
         self.is_active = True
         self.last_activity = datetime.now().isoformat()
         self.current_action = action
@@ -261,7 +328,6 @@ class WorkflowState:
 
     def mark_inactive(self):
         """백엔드 활동 종료 표시"""
-        from datetime import datetime
         self.is_active = False
         self.last_activity = datetime.now().isoformat()
         self.current_action = None
@@ -272,33 +338,11 @@ class WorkflowState:
 
     def can_advance(self) -> bool:
         """다음 단계로 전진 가능한지 확인"""
-        phase_checks = {
-            Phase.INPUT: self.input_phase_complete,
-            Phase.ANALYSIS: self.analysis_phase_complete,
-            Phase.SPEC_GENERATION: self.spec_generation_phase_complete,
-            Phase.COMPILATION: self.compilation_phase_complete,
-            Phase.DOC_IMPL: self.doc_impl_phase_complete,
-            Phase.DRAFT: self.draft_phase_complete,
-            Phase.FEEDBACK: lambda: True,  # 항상 가능
-            Phase.REFINEMENT: lambda: self.user_satisfaction is not None,
-            Phase.FINAL: lambda: True
-        }
-        return phase_checks[self.current_phase]()
+        return _PHASE_CHECKS[self.current_phase](self)
 
     def next_phase(self) -> Phase:
         """다음 Phase 결정"""
-        transitions = {
-            Phase.INPUT: Phase.ANALYSIS,
-            Phase.ANALYSIS: Phase.SPEC_GENERATION,
-            Phase.SPEC_GENERATION: Phase.COMPILATION,
-            Phase.COMPILATION: Phase.DOC_IMPL,
-            Phase.DOC_IMPL: Phase.DRAFT,
-            Phase.DRAFT: Phase.FEEDBACK,
-            Phase.FEEDBACK: Phase.REFINEMENT,
-            Phase.REFINEMENT: Phase.DRAFT,  # 루프!
-            Phase.FINAL: Phase.FINAL  # 종료
-        }
-        return transitions[self.current_phase]
+        return _NEXT_PHASE[self.current_phase]
 
     def advance(self) -> bool:
         """상태 전이 (검증 포함)"""
@@ -311,7 +355,8 @@ class WorkflowState:
     # 컴파일 재시도 로직
     # ========================================================================
 
-    MAX_COMPILE_ATTEMPTS = 5
+    # 클래스 상수 (dataclass 필드/슬롯 아님)
+    MAX_COMPILE_ATTEMPTS: ClassVar[int] = 5
 
     def can_retry_compile(self) -> bool:
         """재시도 가능 여부"""
@@ -333,67 +378,76 @@ class WorkflowState:
         """버전 번호를 문자열로"""
         return f"v{self.version}"
 
+    def phase_str(self) -> str:
+        """현재 Phase를 문자열로 (str(current_phase)와 동일)"""
+        return _PHASE_STR[self.current_phase]
+
     # ========================================================================
     # 진행률 계산
     # ========================================================================
 
     def progress(self) -> float:
         """현재 진행률 (0.0 ~ 1.0)"""
-        phase_weights = {
-            Phase.INPUT: 0.0,
-            Phase.ANALYSIS: 0.1,
-            Phase.SPEC_GENERATION: 0.2,
-            Phase.COMPILATION: 0.4,
-            Phase.DOC_IMPL: 0.6,
-            Phase.DRAFT: 0.7,
-            Phase.FEEDBACK: 0.8,
-            Phase.REFINEMENT: 0.85,
-            Phase.FINAL: 1.0
-        }
-        return phase_weights.get(self.current_phase, 0.0)
+        return _PHASE_PROGRESS.get(self.current_phase, 0.0)
 
     # ========================================================================
     # 저장/로드
     # ========================================================================
 
     def save(self, output_dir: Path):
-        """상태를 JSON 파일로 저장"""
-        state_file = output_dir / self.project_name / "workflow_state.json"
-        state_file.parent.mkdir(parents=True, exist_ok=True)
-
-        # dataclass → dict → JSON
-        data = asdict(self)
-
-        # Enum → string 변환
-        data['current_phase'] = self.current_phase.value
-
-        # CompileResult 변환
-        if self.compile_result:
-            data['compile_result'] = {
-                'success': self.compile_result.success,
-                'error_msg': self.compile_result.error_msg
-            }
-
-        # UserSatisfaction 변환
-        if self.user_satisfaction:
-            data['user_satisfaction'] = {
-                'satisfied': self.user_satisfaction.satisfied,
-                'revision_request': self.user_satisfaction.revision_request
-            }
-
-        with open(state_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        """
+        상태를 JSON 파일로 저장
+
+        버전별로 workflow_state.v{version}.json에 저장하고, workflow_state.json은
+        최신 버전 파일을 가리키는 심볼릭 링크로 원자적으로 교체한다. 이전 버전
+        파일은 그대로 남으므로 load(version=N)으로 고정해서 읽을 수 있다
+        (최근 MAX_STATE_VERSIONS개만 보관).
+
+        직전에 저장한 내용과 같으면 쓰지 않고, 다르면 임시 파일에 쓴 뒤
+        os.replace로 교체한다 (status 폴링이 반쯤 쓰인 JSON을 읽지 않음).
+        피드백/초안이 쌓여 COMPRESS_MIN_BYTES를 넘으면 zstd로 압축한다.
+        STATE_FORMAT=msgpack이면 JSON 대신 msgpack으로 저장한다 (파일명은 동일,
+        load는 내용으로 형식을 판별).
+        """
+        state_dir = output_dir / self.project_name
+        version_file = state_dir / _version_file_name(self.version)
+
+        # dataclass → JSON/msgpack (asdict로 전체를 복사하지 않고 인코더가 직접 순회)
+        if msgpack_enabled():
+            payload = msgpack.packb(self, default=_json_default, use_bin_type=True)
+        else:
+            payload = json_utils.dumps(self, indent=True, default=_json_default)
+        payload = _encode_state_file(payload)
+        try:
+            _write_if_changed(version_file, payload)
+        except FileNotFoundError:
+            # 디렉토리는 첫 저장 때(또는 지워진 경우)만 생성
+            state_dir.mkdir(parents=True, exist_ok=True)
+            _write_if_changed(version_file, payload)
+        if _link_latest(state_dir / "workflow_state.json", version_file.name):
+            _prune_versions(state_dir, self.version)
 
     @classmethod
-    def load(cls, project_name: str, output_dir: Path) -> Optional['WorkflowState']:
-        """JSON 파일에서 상태 로드"""
-        state_file = output_dir / project_name / "workflow_state.json"
+    def load(cls, project_name: str, output_dir: Path,
+             version: Optional[int] = None) -> Optional['WorkflowState']:
+        """
+        JSON 파일에서 상태 로드
 
-        if not state_file.exists():
+        Args:
+            version: 지정하면 해당 버전 파일 (없으면 최신)
+        """
+        state_dir = output_dir / project_name
+        if version is None:
+            state_file = state_dir / "workflow_state.json"
+        else:
+            state_file = state_dir / _version_file_name(version)
+
+        try:
+            raw = state_file.read_bytes()
+        except FileNotFoundError:
             return None
 
-        with open(state_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = _loads_state(_decode_state_file(raw))
 
         # string → Enum 변환
         data['current_phase'] = Phase(data['current_phase'])
@@ -409,10 +463,160 @@ class WorkflowState:
         return cls(**data)
 
 
+# Phase → 완료 조건 (호출마다 바운드 메서드 dict를 만들지 않도록 한 번만 생성)
+_PHASE_CHECKS = MappingProxyType({
+    Phase.INPUT: WorkflowState.input_phase_complete,
+    Phase.ANALYSIS: WorkflowState.analysis_phase_complete,
+    Phase.SPEC_GENERATION: WorkflowState.spec_generation_phase_complete,
+    Phase.COMPILATION: WorkflowState.compilation_phase_complete,
+    Phase.DOC_IMPL: WorkflowState.doc_impl_phase_complete,
+    Phase.DRAFT: WorkflowState.draft_phase_complete,
+    Phase.FEEDBACK: lambda state: True,  # 항상 가능
+    Phase.REFINEMENT: lambda state: state.user_satisfaction is not None,
+    Phase.FINAL: lambda state: True
+})
+
+
 # ============================================================================
 # 헬퍼 함수
 # ============================================================================
 
+def log_timestamp() -> str:
+    """
+    로그용 "HH:MM:SS" (현지 시각)
+
+    같은 초에 연달아 찍히는 로그는 직전에 포맷한 문자열을 재사용한다.
+    """
+    global _LOG_TIMESTAMP
+    now = int(time.time())
+    second, text = _LOG_TIMESTAMP
+    if second != now:
+        text = time.strftime("%H:%M:%S", time.localtime(now))
+        _LOG_TIMESTAMP = (now, text)
+    return text
+
+
+def _write_if_changed(path: Path, payload: bytes) -> bool:
+    """
+    내용이 바뀐 경우에만 원자적으로 저장
+
+    직접 쓴 파일은 해시와 stat을 기억해두고, 그 사이 다른 곳에서 파일을
+    고치지 않았으면(stat 동일) 같은 내용을 다시 쓰지 않는다.
+
+    Returns:
+        실제로 썼으면 True
+    """
+    key = str(path.resolve())
+    digest = hashlib.blake2b(payload, digest_size=16).digest()
+    try:
+        st = path.stat()
+        if _SAVED_FILES.get(key) == (digest, st.st_mtime_ns, st.st_size):
+            return False
+    except FileNotFoundError:
+        pass
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+    st = path.stat()
+    _SAVED_FILES[key] = (digest, st.st_mtime_ns, st.st_size)
+    return True
+
+
+@functools.cache
+def _field_names(cls) -> Tuple[str, ...]:
+    """dataclass 필드 이름 (클래스별로 한 번만 계산)"""
+    return tuple(f.name for f in fields(cls))
+
+
+def _json_default(obj):
+    """
+    JSON 인코더가 모르는 타입 변환
+
+    dataclass → 필드 dict (중첩 값은 인코더가 다시 변환), Enum → value, deque → list.
+    orjson은 dataclass/Enum을 직접 직렬화하므로 deque만 여기로 온다.
+    """
+    if isinstance(obj, deque):
+        return list(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {name: getattr(obj, name) for name in _field_names(type(obj))}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _version_file_name(version: int) -> str:
+    return f"workflow_state.v{version}.json"
+
+
+def _link_latest(link: Path, target_name: str) -> bool:
+    """
+    link가 target_name을 가리키도록 심볼릭 링크를 원자적으로 교체
+
+    Returns:
+        링크를 새로 만들었거나 바꿨으면 True
+    """
+    if link.is_symlink() and os.readlink(link) == target_name:
+        return False
+
+    # 임시 링크 이름은 호출마다 고유 (같은 프로세스의 여러 스레드가 동시에 저장하는 경우 대비)
+    tmp_link = link.with_name(f".{link.name}.{uuid.uuid4().hex}.link")
+    os.symlink(target_name, tmp_link)
+    try:
+        os.replace(tmp_link, link)
+    except BaseException:
+        tmp_link.unlink(missing_ok=True)
+        raise
+    return True
+
+
+def _prune_versions(state_dir: Path, latest: int) -> None:
+    """최근 MAX_STATE_VERSIONS개보다 오래된 버전 파일 삭제"""
+    for path in state_dir.glob("workflow_state.v*.json"):
+        try:
+            version = int(path.name[len("workflow_state.v"):-len(".json")])
+        except ValueError:
+            continue
+        if version <= latest - MAX_STATE_VERSIONS:
+            path.unlink(missing_ok=True)
+
+
+def _encode_state_file(payload: bytes) -> bytes:
+    """큰 상태 JSON은 zstd로 압축 (작은 파일은 사람이 읽을 수 있게 그대로)"""
+    if zstandard is None or len(payload) < COMPRESS_MIN_BYTES:
+        return payload
+    return zstandard.ZstdCompressor(level=1).compress(payload)
+
+
+def _decode_state_file(data: bytes) -> bytes:
+    """상태 파일 내용 → JSON/msgpack bytes (zstd 프레임이면 압축 해제)"""
+    if not data.startswith(_ZSTD_MAGIC):
+        return data
+    if zstandard is None:
+        raise RuntimeError("workflow_state.json is zstd-compressed; install zstandard to read it")
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+def msgpack_enabled() -> bool:
+    """STATE_FORMAT=msgpack이고 msgpack이 설치되어 있으면 msgpack으로 저장"""
+    return msgpack is not None and os.getenv("STATE_FORMAT") == "msgpack"
+
+
+def _loads_state(payload: bytes) -> dict:
+    """JSON 또는 msgpack 상태 bytes → dict (첫 바이트로 판별)"""
+    if payload[:1] and payload[0] in _MSGPACK_MAP_MARKERS:
+        if msgpack is None:
+            raise RuntimeError("workflow_state.json is msgpack-encoded; install msgpack to read it")
+        return msgpack.unpackb(payload, raw=False)
+    return json_utils.loads(payload)
+
+
 def create_initial_state(
     project_name: str,
     user_prompt: str,
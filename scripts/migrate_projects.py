@@ -33,6 +33,7 @@ Safety Guarantees:
   - RequiredFilesExist: 필수 파일 존재
 """
 
+import os
 import json
 import shutil
 from pathlib import Path
@@ -40,6 +41,11 @@ from datetime import datetime
 from typing import Optional, Dict, Any
 
 
+# 큰 workflow_state.json은 zstd로 압축 저장됨 (backend/agent/workflow_state.py)
+# STATE_FORMAT=msgpack이면 내용은 JSON 대신 msgpack
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
 def migrate_project(project_name: str, dry_run: bool = True) -> bool:
     """
     단일 프로젝트 마이그레이션
@@ -81,12 +87,21 @@ def migrate_project(project_name: str, dry_run: bool = True) -> bool:
     print(f"  [1/7] 📁 Created directory structure: {new_project}")
 
     # Step 2: CopyState (MigrateState)
-    with open(old_state_file, 'r', encoding='utf-8') as f:
-        old_state = json.load(f)
+    state_bytes = old_state_file.read_bytes()
+    if state_bytes.startswith(ZSTD_MAGIC):
+        import zstandard
+        state_bytes = zstandard.ZstdDecompressor().decompress(state_bytes)
+    if not state_bytes.lstrip().startswith(b"{"):
+        # STATE_FORMAT=msgpack으로 저장된 상태 → state.json은 JSON으로 기록
+        import msgpack
+        state_bytes = json.dumps(
+            msgpack.unpackb(state_bytes, raw=False), indent=2, ensure_ascii=False
+        ).encode("utf-8")
+    old_state = json.loads(state_bytes)
 
     new_state_path = new_project / "state.json"
     if not dry_run:
-        shutil.copy2(old_state_file, new_state_path)
+        new_state_path.write_bytes(state_bytes)
     print(f"  [2/7] ✅ Copied: {old_state_file.name} → {new_state_path.name}")
 
     # Step 3: GenerateMetadata (CreateMetadata)
@@ -116,7 +131,12 @@ def migrate_project(project_name: str, dry_run: bool = True) -> bool:
         for ref_file in ref_files:
             dest = new_project / "input" / "references" / ref_file.name
             if not dry_run:
-                if ref_file.is_file():
+                if ref_file.is_symlink():
+                    # 업로드 파일명 → references/<sha256> 링크는 링크 그대로 복사
+                    # (따라가서 복사하면 같은 내용이 두 번 저장됨)
+                    dest.unlink(missing_ok=True)
+                    os.symlink(os.readlink(ref_file), dest)
+                elif ref_file.is_file():
                     shutil.copy2(ref_file, dest)
                 else:
                     shutil.copytree(ref_file, dest, dirs_exist_ok=True)